@@ -0,0 +1,13 @@
+import functools
+import os
+
+
+ASSET_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "images")
+
+
+@functools.lru_cache(maxsize = None)
+def load_image(name):
+    # Bundled images are read once per process and handed to st.image as the encoded file bytes,
+    # which Streamlit serves as they are instead of re-encoding a decoded image on every rerun
+    with open(os.path.join(ASSET_DIR, name), "rb") as f:
+        return f.read()
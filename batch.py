@@ -0,0 +1,187 @@
+"""Headless batch scoring of Course Tracker spreadsheets.
+
+Scores every course_details.xlsx style file (expected_headers format) found in the given directories
+or glob patterns in a process pool, and streams one summary row per student to a CSV or Parquet file.
+
+    python batch.py trackers/ "more/*.xlsx" -o summary.csv --workers 8
+    python batch.py students/ --student-id parent      # students/A0123456X/course_details.xlsx -> A0123456X
+    python batch.py trackers/ --student-id "(A\d{7}[A-Z])"
+
+The student ID is taken from each file's path relative to the directory (or the fixed part of the glob
+pattern) it was found under: the whole relative path without its extension by default, the parent
+folder name, the file name, or the first group of a regular expression searched in the relative path.
+"""
+import argparse
+import csv
+import glob
+import multiprocessing
+import os
+import re
+import sys
+import time
+
+from gpa import summarize
+from tracker import read_tracker_xlsx
+
+
+SUMMARY_COLUMNS = ["student", "file", "status", "gpa", "degree_class", "gpa_cus", "completed_cus",
+                   "total_courses", "gpa_courses", "su_courses", "cscu_courses", "other_courses"]
+
+
+STUDENT_ID_MODES = ["relative", "parent", "stem"]
+
+
+def _glob_root(pattern):
+    # Leading directories of a glob pattern which contain no wildcards
+    parts = []
+    for part in os.path.normpath(pattern).split(os.sep)[:-1]:
+        if glob.has_magic(part):
+            break
+        parts.append(part)
+    return os.sep.join(parts) or os.curdir
+
+
+def find_trackers(inputs):
+    """Yields (path, directory it was found under) for every tracker file."""
+    for item in inputs:
+        if os.path.isdir(item):
+            root = item
+            paths = glob.iglob(os.path.join(item, "**", "*.xlsx"), recursive = True)
+        else:
+            root = _glob_root(item)
+            paths = glob.iglob(item, recursive = True)
+        for path in sorted(paths):
+            # Skip Excel lock files
+            if not os.path.basename(path).startswith("~$"):
+                yield path, root
+
+
+def student_id(path, root, mode = "relative"):
+    """Student ID of a tracker file (None if a regular expression mode does not match)."""
+    relative = os.path.splitext(os.path.relpath(path, root))[0].replace(os.sep, "/")
+    if mode == "relative":
+        return relative
+    if mode == "parent":
+        return os.path.basename(os.path.dirname(os.path.abspath(path)))
+    if mode == "stem":
+        return os.path.basename(relative)
+
+    match = re.search(mode, relative)
+    if match is None:
+        return None
+    return match.group(1) if match.groups() else match.group(0)
+
+
+def score_file(item):
+    path, student = item
+    row = dict.fromkeys(SUMMARY_COLUMNS)
+    row.update(student = student, file = path)
+    if student is None:
+        row["status"] = "error: student ID pattern does not match the path"
+        return row
+
+    try:
+        row.update(summarize(read_tracker_xlsx(path))._asdict())
+        row["status"] = "ok"
+    except Exception as e:
+        row["status"] = f"error: {e}"
+
+    return row
+
+
+class CSVSink:
+    def __init__(self, path):
+        self.file = open(path, "w", newline = "", encoding = "utf-8")
+        self.writer = csv.DictWriter(self.file, fieldnames = SUMMARY_COLUMNS)
+        self.writer.writeheader()
+
+    def write(self, row):
+        self.writer.writerow(row)
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetSink:
+    # Rows are buffered and flushed as row groups, so memory stays bounded by batch_size
+    def __init__(self, path, batch_size = 1000):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self.pa = pa
+        self.schema = pa.schema([("student", pa.string()), ("file", pa.string()), ("status", pa.string()),
+                                 ("gpa", pa.float64()), ("degree_class", pa.string()),
+                                 ("gpa_cus", pa.float64()), ("completed_cus", pa.float64()),
+                                 ("total_courses", pa.int64()), ("gpa_courses", pa.int64()), ("su_courses", pa.int64()),
+                                 ("cscu_courses", pa.int64()), ("other_courses", pa.int64())])
+        self.writer = pq.ParquetWriter(path, self.schema)
+        self.batch_size = batch_size
+        self.rows = []
+
+    def write(self, row):
+        self.rows.append(row)
+        if len(self.rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self.rows:
+            self.writer.write_table(self.pa.Table.from_pylist(self.rows, schema = self.schema))
+            self.rows = []
+
+    def close(self):
+        self.flush()
+        self.writer.close()
+
+
+def open_sink(path):
+    if path.endswith(".parquet"):
+        return ParquetSink(path)
+
+    return CSVSink(path)
+
+
+def run(inputs, output, workers = None, chunksize = 16, progress_every = 500, id_mode = "relative"):
+    sink = open_sink(output)
+    items = ((path, student_id(path, root, id_mode)) for path, root in find_trackers(inputs))
+    scored = failed = 0
+    start = time.perf_counter()
+
+    try:
+        with multiprocessing.Pool(workers) as pool:
+            for row in pool.imap(score_file, items, chunksize = chunksize):
+                sink.write(row)
+                scored += 1
+                failed += row["status"] != "ok"
+                if progress_every and scored % progress_every == 0:
+                    print(f"{scored} files, {scored / (time.perf_counter() - start):.1f} files/s", file = sys.stderr)
+    finally:
+        sink.close()
+
+    elapsed = time.perf_counter() - start
+
+    return scored, failed, elapsed
+
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description = __doc__, formatter_class = argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("inputs", nargs = "+", help = "directories (searched recursively for .xlsx) or glob patterns")
+    parser.add_argument("-o", "--output", default = "summary.csv", help = "output file, .csv or .parquet")
+    parser.add_argument("-w", "--workers", type = int, default = None, help = "worker processes (default: CPU count)")
+    parser.add_argument("--chunksize", type = int, default = 16)
+    parser.add_argument("--student-id", default = "relative", metavar = "MODE",
+                        help = f"how student IDs are taken from file paths: {', '.join(STUDENT_ID_MODES)} or a regular expression (default: relative)")
+    args = parser.parse_args(argv)
+
+    if args.student_id not in STUDENT_ID_MODES:
+        try:
+            re.compile(args.student_id)
+        except re.error as e:
+            parser.error(f"invalid --student-id pattern: {e}")
+
+    scored, failed, elapsed = run(args.inputs, args.output, workers = args.workers, chunksize = args.chunksize, id_mode = args.student_id)
+    rate = scored / elapsed if elapsed else 0.0
+    print(f"Scored {scored} files ({failed} failed) in {elapsed:.2f}s, {rate:.1f} files/s -> {args.output}", file = sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
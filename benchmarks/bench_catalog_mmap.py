@@ -0,0 +1,111 @@
+"""Compiled catalog benchmark: starts several worker processes which each load every AY's catalog,
+either parsed onto the heap (load_catalog) or memory-mapped from the compiled files (load_mapped_catalog),
+and reports each worker's private memory on top of an idle worker, from /proc/self/smaps_rollup.
+
+    python benchmarks/bench_catalog_mmap.py --years 9 --modules 7000 --workers 4
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from catalog import load_catalog, load_mapped_catalog
+from synthetic import academic_years, module_catalogs, module_info_json
+
+
+def smaps_rollup():
+    # Memory counters of this process in kB
+    counters = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                counters[parts[0].rstrip(":")] = int(parts[1])
+    return counters
+
+
+def worker(mode, years, cache_dir, barrier, queue):
+    start = time.perf_counter()
+    catalogs = []
+    if mode == "heap":
+        for rel_years in years:
+            catalog = load_catalog(rel_years, cache_dir = cache_dir)
+            catalog.search_index
+            catalog.with_credits().search_index
+            catalogs.append(catalog)
+    elif mode == "mmap":
+        catalogs = [load_mapped_catalog(rel_years, cache_dir = cache_dir) for rel_years in years]
+    elapsed = time.perf_counter() - start
+
+    # Touch every course as a busy worker would over time
+    for catalog in catalogs:
+        for code in catalog.search_index.search("", limit = len(catalog)):
+            catalog.search_index.label(code)
+        catalog.with_credits().search_index.search("data")
+
+    counters = smaps_rollup()
+    queue.put((mode, elapsed, counters["Rss"], counters["Pss"], counters["Private_Clean"] + counters["Private_Dirty"]))
+    # Stay alive until every worker has measured, so shared pages are counted as shared
+    barrier.wait()
+
+
+def run_workers(mode, n_workers, years, cache_dir):
+    ctx = multiprocessing.get_context("spawn")
+    barrier = ctx.Barrier(n_workers)
+    queue = ctx.Queue()
+    processes = [ctx.Process(target = worker, args = (mode, years, cache_dir, barrier, queue)) for _ in range(n_workers)]
+    for process in processes:
+        process.start()
+    results = [queue.get() for _ in processes]
+    for process in processes:
+        process.join()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description = __doc__, formatter_class = argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--years", type = int, default = 9)
+    parser.add_argument("--modules", type = int, default = 7000)
+    parser.add_argument("--workers", type = int, default = 4)
+    args = parser.parse_args()
+
+    years = academic_years(args.years)
+    cache_dir = tempfile.mkdtemp(prefix = "bench_catalog_mmap_")
+
+    # Fresh moduleInfo.json payloads in the on-disk cache, so no worker touches the network
+    for rel_years, courses in module_catalogs(args.modules, years).items():
+        with open(os.path.join(cache_dir, f"moduleInfo_{rel_years}.json"), "wb") as f:
+            f.write(module_info_json(courses))
+        with open(os.path.join(cache_dir, f"moduleInfo_{rel_years}.meta.json"), "w") as f:
+            json.dump({"fetched_at": time.time() + 24 * 60 * 60}, f)
+
+    # Compile once up front and check the mapped catalogs against the parsed ones
+    start = time.perf_counter()
+    for rel_years in years:
+        mapped = load_mapped_catalog(rel_years, cache_dir = cache_dir)
+        parsed = load_catalog(rel_years, cache_dir = cache_dir)
+        assert sorted(mapped) == sorted(parsed)
+        assert all(mapped[code] == parsed[code] for code in parsed)
+        for query in ["", "cs", "data str", "intro"]:
+            assert mapped.search_index.search(query) == parsed.search_index.search(query), query
+    print(f"compiled {args.years} AYs in {time.perf_counter() - start:.2f} s")
+
+    idle = run_workers("idle", args.workers, years, cache_dir)
+    idle_private = min(r[4] for r in idle)
+
+    print(f"{'mode':<8}{'load s':>10}{'RSS MB':>10}{'PSS MB':>10}{'private MB':>12}{'extra MB':>10}")
+    for mode in ["heap", "mmap"]:
+        results = run_workers(mode, args.workers, years, cache_dir)
+        for _, elapsed, rss, pss, private in results:
+            print(f"{mode:<8}{elapsed:>10.3f}{rss / 1024:>10.1f}{pss / 1024:>10.1f}{private / 1024:>12.1f}{(private - idle_private) / 1024:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
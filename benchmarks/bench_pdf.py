@@ -0,0 +1,98 @@
+"""PDF export benchmark: latency and peak RSS of the native report.summary_pdf renderer against the
+Plotly + kaleido (headless Chromium) path the app used before. Each backend runs in its own process.
+The kaleido path needs `pip install kaleido==0.2.1`.
+
+    python benchmarks/bench_pdf.py --runs 10
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TABLE_DICT = {
+    "Final GPA": 4.123,
+    "Degree Classification": "Honours (Distinction)",
+    "Your GPA (To 4 d.p.)": 4.1234,
+    "No. of CUs used to calculate GPA": 120.0,
+    "Total No. of CUs completed successfully": 140.0,
+    "Total No. of courses attempted (A + B + C + D)": 38,
+    "No. of courses accounted for in GPA (A)": 30,
+    "No. of courses which were S/Ued (B)": 4,
+    "No. of CS/CU/OVS/OVU courses taken (C)": 2,
+    "No. of courses with a 'EXE', 'IC', 'OVI', 'IP' or 'W' grade (D)": 2,
+    "Date of Overview": "01 Jan 2025"
+}
+
+PROBE = """
+import io, json, resource, sys, time
+sys.path.insert(0, %(root)r)
+from report import ROW_FILL_COLORS, ROW_FONT_COLORS, summary_pdf
+
+table_dict, backend, runs = %(table_dict)r, %(backend)r, %(runs)d
+
+def kaleido_pdf():
+    import plotly.graph_objects as go
+    fig = go.Figure(data = [go.Table(
+        columnwidth = [2.5, 1.5],
+        header = dict(values = ["<b>Course and GPA Summary Metrics<b>", "<b>Value<b>"], fill_color = "navy", line_color = "black", align = "center", font = dict(color = "white", size = 14, family = "Arial")),
+        cells = dict(values = [list(table_dict.keys()), list(table_dict.values())], fill_color = [ROW_FILL_COLORS, ROW_FILL_COLORS], line_color = "black", align = ["right", "left"],
+                     font = dict(color = [ROW_FONT_COLORS, ROW_FONT_COLORS], size = [14, 14], family = "Arial"), height = 25))])
+    fig.update_layout(height = 318, width = 700, margin = dict(l = 5, r = 5, t = 5, b = 5))
+    buffer = io.BytesIO()
+    fig.write_image(file = buffer, scale = 6, format = "pdf")
+    return buffer.getvalue()
+
+render = kaleido_pdf if backend == "kaleido" else lambda: summary_pdf(table_dict)
+times = []
+for _ in range(runs):
+    start = time.perf_counter()
+    data = render()
+    times.append(time.perf_counter() - start)
+
+def tree_peak_kb(pid):
+    # Peak RSS of a process and all its descendants (Linux /proc), e.g. kaleido's Chromium
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            peak = next(int(line.split()[1]) for line in f if line.startswith("VmHWM"))
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            children = [int(child) for child in f.read().split()]
+    except (OSError, StopIteration):
+        return 0
+    return peak + sum(tree_peak_kb(child) for child in children)
+
+import os
+maxrss_kb = tree_peak_kb(os.getpid()) or resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({"times": times, "bytes": len(data), "maxrss_kb": maxrss_kb}))
+"""
+
+
+def run_backend(backend, runs):
+    result = subprocess.run([sys.executable, "-c", PROBE % {"root": ROOT, "table_dict": TABLE_DICT, "backend": backend, "runs": runs}],
+                            capture_output = True, text = True)
+    if result.returncode != 0:
+        return None, result.stderr.strip().splitlines()[-1]
+
+    return json.loads(result.stdout.strip().splitlines()[-1]), None
+
+
+def main():
+    parser = argparse.ArgumentParser(description = __doc__, formatter_class = argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type = int, default = 10)
+    args = parser.parse_args()
+
+    print(f"{'backend':>8} {'first (ms)':>11} {'p50 (ms)':>9} {'max (ms)':>9} {'peak RSS incl. children (MB)':>29} {'size (KB)':>10}")
+    for backend in ["native", "kaleido"]:
+        stats, error = run_backend(backend, args.runs)
+        if stats is None:
+            print(f"{backend:>8} skipped: {error}")
+            continue
+        times = sorted(stats["times"][1:] or stats["times"])
+        print(f"{backend:>8} {stats['times'][0] * 1000:>11.1f} {times[len(times) // 2] * 1000:>9.1f} {times[-1] * 1000:>9.1f} {stats['maxrss_kb'] / 1024:>29.1f} {stats['bytes'] / 1024:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
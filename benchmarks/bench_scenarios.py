@@ -0,0 +1,43 @@
+"""Scenario engine benchmark: times scenarios.grade_scenarios' exact dynamic program and its Monte Carlo
+fallback up to 15 courses. The exact engine is checked against brute force in tests/test_scenarios.py.
+
+    python benchmarks/bench_scenarios.py --seed 0
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gpa import DEGREE_CLASSES
+from scenarios import grade_scenarios
+
+
+def main():
+    parser = argparse.ArgumentParser(description = __doc__, formatter_class = argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seed", type = int, default = 0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+
+    print(f"{'courses':>8} {'exact (ms)':>11} {'monte carlo (ms)':>17} {'max |exact - mc|':>17}")
+    for n in [5, 10, 15]:
+        course_cus = rng.choice([2.0, 4.0, 4.0, 4.0, 6.0, 8.0], size = n).tolist()
+
+        start = time.perf_counter()
+        exact = grade_scenarios(course_cus, 3.8, 60)
+        exact_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        mc = grade_scenarios(course_cus, 3.8, 60, max_states = 0, seed = args.seed)
+        mc_time = time.perf_counter() - start
+
+        error = max(abs(exact.probabilities[k] - mc.probabilities[k]) for k in DEGREE_CLASSES)
+        print(f"{n:>8} {exact_time * 1000:>11.2f} {mc_time * 1000:>17.2f} {error:>17.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""Scoring service throughput benchmark: starts service.ScoringServer against the local NUSMods stand-in and
+drives POST /score from concurrent local clients, reporting requests/s, students/s and request latency
+for each worker pool size and batch size. Course CUs are left out of the requests, so every course is
+looked up in the mapped catalog.
+
+    python benchmarks/bench_service.py --workers 0 2 4 --batch 1 100 1000 --clients 4 --seconds 5
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+def make_students(n, courses, codes, credits, rng):
+    # Student records as a client would send them, with the expected CUs of each for checking the results
+    from gpa import GRADES
+
+    students, expected_cus = [], []
+    for i in range(n):
+        picked = rng.integers(0, len(codes), size = courses)
+        grades = rng.choice(GRADES, size = courses)
+        students.append({"id": f"A{i:07d}",
+                         "courses": [{"code": codes[k], "grade": str(g)} for k, g in zip(picked.tolist(), grades)],
+                         "new_cus": 20 if i % 2 else None})
+        expected_cus.append(credits[picked])
+    return students, expected_cus
+
+
+def check(results, students, expected_cus):
+    # Every result must match the app's own summary engine over the same rows
+    from gpa import summarize
+
+    for result, student, cus in zip(results, students, expected_cus):
+        assert result["status"] == "ok", result
+        rows = [[c["code"], "", float(cu), c["grade"], None, ""] for c, cu in zip(student["courses"], cus)]
+        summary = summarize(rows)
+        assert result["degree_class"] == summary.degree_class, (result, summary)
+        assert np.isclose(result["gpa"], summary.gpa) and np.isclose(result["completed_cus"], summary.completed_cus), (result, summary)
+        assert ("forecast" in result) == bool(student["new_cus"])
+
+
+def drive(session, url, body, n_clients, seconds):
+    # Each client posts the same pre-encoded batch back to back over the pooled keep-alive connections
+    latencies = [[] for _ in range(n_clients)]
+    deadline = time.perf_counter() + seconds
+
+    def client(out):
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            response = session.post(url + "/score", data = body, headers = {"Content-Type": "application/json"})
+            response.raise_for_status()
+            out.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target = client, args = (out,)) for out in latencies]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return np.concatenate([np.array(out) for out in latencies]), time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description = __doc__, formatter_class = argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type = int, nargs = "+", default = [0, 1, 2, 4], help = "worker pool sizes (0 scores in the request threads)")
+    parser.add_argument("--batch", type = int, nargs = "+", default = [1, 10, 100, 1000], help = "students per request")
+    parser.add_argument("--courses", type = int, default = 40, help = "courses per student")
+    parser.add_argument("--clients", type = int, default = 4, help = "concurrent client connections")
+    parser.add_argument("--seconds", type = float, default = 5.0, help = "duration of each run")
+    parser.add_argument("--modules", type = int, default = 7000)
+    parser.add_argument("--chunksize", type = int, default = 256)
+    parser.add_argument("--seed", type = int, default = 0)
+    args = parser.parse_args()
+
+    # The app reads these at import, and the spawned workers inherit them, so they are set before anything from the app is imported
+    os.environ["NUS_GPA_CACHE_DIR"] = tempfile.mkdtemp(prefix = "bench_service_")
+    from nusmods_stub import NUSModsStub, synthetic_payloads
+    from synthetic import academic_years, module_catalogs
+
+    years = academic_years(2)
+    stub = NUSModsStub(synthetic_payloads(args.modules, years)).start()
+    os.environ["NUS_GPA_NUSMODS_API"] = stub.url
+    import catalog
+    catalog.NUSMODS_API = stub.url
+    from http_client import get_session
+    from service import ScoringServer
+
+    latest = module_catalogs(args.modules, years)[years[-1]]
+    codes = [c["moduleCode"] for c in latest]
+    credits = np.array([float(c["moduleCredit"]) for c in latest])
+    rng = np.random.default_rng(args.seed)
+
+    print(f"{args.courses} courses per student, {args.clients} clients, {args.seconds:.0f}s per run, {os.cpu_count()} CPUs")
+    print(f"{'workers':>8}{'batch':>7}{'requests':>10}{'req/s':>10}{'students/s':>12}{'p50 ms':>10}{'p99 ms':>10}")
+    for workers in args.workers:
+        server = ScoringServer(("127.0.0.1", 0), workers = workers, chunksize = args.chunksize, years = years).start()
+        try:
+            for batch in args.batch:
+                students, expected_cus = make_students(batch, args.courses, codes, credits, rng)
+                body = json.dumps({"students": students}).encode()
+
+                # Correctness first, which also warms up the workers and their catalog mappings
+                response = get_session().post(server.url + "/score", data = body)
+                check(response.json()["results"], students, expected_cus)
+
+                latencies, elapsed = drive(get_session(), server.url, body, args.clients, args.seconds)
+                p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+                print(f"{workers:>8}{batch:>7}{len(latencies):>10}{len(latencies) / elapsed:>10.1f}{len(latencies) * batch / elapsed:>12.0f}{p50:>10.1f}{p99:>10.1f}", flush = True)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    stub.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Cold start benchmark: imports main.py in fresh interpreters and fails if the median import
+time goes over the budget, or if a library that should be loaded lazily is imported eagerly.
+
+    python benchmarks/bench_startup.py --runs 5 --budget 2.5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Libraries only needed by the analysis, export and PDF paths
+LAZY_MODULES = ["matplotlib", "altair", "xlsxwriter", "openpyxl", "kaleido"]
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import main
+elapsed = time.perf_counter() - start
+print(json.dumps({"seconds": elapsed, "loaded": [m for m in %r if m in sys.modules]}))
+""" % (LAZY_MODULES,)
+
+
+def measure_once():
+    result = subprocess.run([sys.executable, "-c", PROBE], cwd = ROOT, capture_output = True, text = True, check = True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description = __doc__, formatter_class = argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type = int, default = 5)
+    parser.add_argument("--budget", type = float, default = 2.5, help = "maximum median cold import time in seconds")
+    args = parser.parse_args()
+
+    # One untimed run warms the OS file cache so results reflect interpreter work
+    measure_once()
+    runs = [measure_once() for _ in range(args.runs)]
+    times = sorted(r["seconds"] for r in runs)
+    eager = sorted(set(m for r in runs for m in r["loaded"]))
+
+    print(f"cold import of main.py over {args.runs} runs: median {statistics.median(times):.3f}s, min {times[0]:.3f}s, max {times[-1]:.3f}s (budget {args.budget:.3f}s)")
+
+    failed = False
+    if statistics.median(times) > args.budget:
+        print("FAIL: median cold import time is over budget")
+        failed = True
+    if eager:
+        print("FAIL: libraries expected to load lazily were imported at startup: " + ", ".join(eager))
+        failed = True
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""S/U optimizer benchmark: shows how su_option.optimize_su's exact dynamic program scales with the number
+of tracked courses. The optimizer is checked against brute force in tests/test_su_option.py.
+
+    python benchmarks/bench_su_option.py --sizes 50 200 1000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gpa import GRADES_TO_GPA, summarize
+from su_option import optimize_su
+
+
+GRADED = [grade for grade, gp in GRADES_TO_GPA.items() if gp is not None]
+
+
+def make_rows(n, rng):
+    grades = rng.choice(GRADED + ["S", "CS", "IP"], size = n)
+    cus = rng.choice([2.0, 4.0, 4.0, 4.0, 6.0, 8.0], size = n)
+    return [[f"CS{i:04d}", "Synthetic Course", float(cu), str(grade), GRADES_TO_GPA[grade], "2024/2025"] for i, (cu, grade) in enumerate(zip(cus, grades))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description = __doc__, formatter_class = argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type = int, nargs = "+", default = [10, 50, 100, 200, 500, 1000])
+    parser.add_argument("--budget", type = float, default = 32.0)
+    parser.add_argument("--seed", type = int, default = 0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+
+    print(f"{'courses':>8} {'optimize (ms)':>14} {'GPA before':>11} {'GPA after':>10} {'S/U CUs':>8}")
+    for n in args.sizes:
+        rows = make_rows(n, rng)
+        start = time.perf_counter()
+        plan = optimize_su(rows, args.budget)
+        elapsed = time.perf_counter() - start
+        print(f"{n:>8} {elapsed * 1000:>14.2f} {summarize(rows).gpa:>11.4f} {plan.summary.gpa:>10.4f} {plan.su_cus:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""Benchmark suite over the app's hot paths, fully offline: synthetic moduleInfo.json catalogs are served
+from a local NUSMods stand-in and synthetic trackers are uploaded as .xlsx workbooks. Reports latency
+percentiles and the traced peak memory of every stage, and can compare against a saved baseline.
+
+    python benchmarks/bench_suite.py --modules 7000 --rows 100 1000 10000 --json results.json
+    python benchmarks/bench_suite.py --baseline results.json --tolerance 0.25
+"""
+import argparse
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from catalog import Catalog, MappedCatalog, SearchIndex, fetch_module_info, write_catalog_file
+from export import to_excel
+from gpa import DEGREE_CLASSES, calculate_new_gpa_same_grade, points_to_grade_range, req_weighted_grade_points, summarize
+from http_client import get_session
+from nusmods_stub import NUSModsStub, synthetic_payloads
+from report import ROW_FILL_COLORS, ROW_FONT_COLORS, summary_pdf
+from scenarios import grade_scenarios
+from synthetic import academic_years, make_tracker, module_catalogs, tracker_xlsx
+from tracker import ingest_upload
+
+
+def analysis(df):
+    # The View Analysis block: summary metrics and the Plotly table
+    import plotly.graph_objects as go
+
+    table_dict = summarize(df).table_dict()
+    fig = go.Figure(data = [go.Table(columnwidth = [2.5, 1.5],
+                                     header = dict(values = ["<b>Course and GPA Summary Metrics<b>", "<b>Value<b>"], fill_color = "navy"),
+                                     cells = dict(values = [list(table_dict.keys()), list(table_dict.values())],
+                                                  fill_color = [ROW_FILL_COLORS, ROW_FILL_COLORS], font = dict(color = [ROW_FONT_COLORS, ROW_FONT_COLORS])))])
+    fig.update_layout(height = 318, width = 700)
+    return fig.to_plotly_json()
+
+
+def forecast(course_cus, current_gpa = 4.2, current_cus = 80.0):
+    # The forecast results block: best/worst cases, required grades per class and the scenario shares
+    new_cus = sum(course_cus)
+    results = [calculate_new_gpa_same_grade(5, current_gpa, current_cus, new_cus), calculate_new_gpa_same_grade(0, current_gpa, current_cus, new_cus)]
+    for threshold in DEGREE_CLASSES.values():
+        required = req_weighted_grade_points(threshold, current_gpa, current_cus, new_cus)
+        results.append(points_to_grade_range(required) if required != "Impossible" else required)
+    results.append(grade_scenarios(course_cus, current_gpa, current_cus))
+    return results
+
+
+def timed(func, runs, max_seconds):
+    times = []
+    deadline = time.perf_counter() + max_seconds
+    while len(times) < runs and (len(times) < 3 or time.perf_counter() < deadline):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def traced_peak(func):
+    # Highest extra memory while the stage runs once (separately from timing, as tracing slows it down)
+    tracemalloc.start()
+    baseline, _ = tracemalloc.get_traced_memory()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak - baseline
+
+
+def run_suite(args, work_dir):
+    years = academic_years(args.years)
+    server = NUSModsStub(synthetic_payloads(args.modules, years), delay = args.latency).start()
+    session = get_session()
+    rel_years = years[-1]
+
+    warm_dir = os.path.join(work_dir, "warm")
+    raw = fetch_module_info(rel_years, cache_dir = warm_dir, session = session, api = server.url)
+    catalog = Catalog.from_json(raw)
+    compiled_path = os.path.join(work_dir, "compiled.bin")
+    write_catalog_file(compiled_path, catalog)
+    courses = module_catalogs(args.modules, years)[rel_years]
+
+    def cold_fetch():
+        cache_dir = tempfile.mkdtemp(dir = work_dir)
+        fetch_module_info(rel_years, cache_dir = cache_dir, session = session, api = server.url)
+        shutil.rmtree(cache_dir)
+
+    stages = [
+        ("catalog_fetch (cold)", cold_fetch),
+        ("catalog_fetch (304)", lambda: fetch_module_info(rel_years, cache_dir = warm_dir, ttl = 0, session = session, api = server.url)),
+        ("catalog_parse", lambda: Catalog.from_json(raw)),
+        ("search_index", lambda: (SearchIndex(catalog), SearchIndex(catalog.with_credits()))),
+        ("catalog_compile", lambda: write_catalog_file(os.path.join(work_dir, "compile.bin"), catalog)),
+        ("catalog_map", lambda: MappedCatalog(compiled_path).search_index.search("data")),
+        ("course_search", lambda: [catalog.search_index.search(q) for q in ["cs", "data str", "intro", "ma1"]]),
+        ("summary_pdf", lambda: summary_pdf(summarize(make_tracker(50)).table_dict())),
+        ("forecast (6 courses)", lambda: forecast([4.0, 4.0, 4.0, 4.0, 2.0, 6.0])),
+        ("forecast (15 courses)", lambda: forecast([4.0] * 12 + [2.0, 6.0, 8.0]))
+    ]
+
+    for rows in args.rows:
+        df = make_tracker(rows, courses = courses)
+        xlsx = tracker_xlsx(df)
+        existing = make_tracker(0)
+        stages += [
+            (f"ingest_upload [{rows}]", lambda xlsx = xlsx, existing = existing: ingest_upload(io.BytesIO(xlsx), catalog, existing)),
+            (f"analysis [{rows}]", lambda df = df: analysis(df)),
+            (f"to_excel [{rows}]", lambda df = df: to_excel(df))
+        ]
+
+    results = {}
+    for name, func in stages:
+        if args.only and not any(pattern in name for pattern in args.only):
+            continue
+        func()
+        times = np.array(timed(func, args.runs, args.max_seconds)) * 1000
+        p50, p90, p99 = np.percentile(times, [50, 90, 99])
+        results[name] = {"runs": len(times), "p50_ms": p50, "p90_ms": p90, "p99_ms": p99, "max_ms": times.max(), "peak_mb": traced_peak(func) / 2**20}
+        print(f"{name:<26}{len(times):>6}{p50:>11.2f}{p90:>11.2f}{p99:>11.2f}{times.max():>11.2f}{results[name]['peak_mb']:>11.2f}", flush = True)
+
+    server.shutdown()
+    return results
+
+
+def compare(results, baseline, tolerance, min_ms = 1.0):
+    # Stages whose median got slower than the baseline by more than the tolerance (ignoring sub-millisecond noise)
+    regressions = []
+    for name, result in results.items():
+        before = baseline.get(name)
+        if before and result["p50_ms"] > max(before["p50_ms"] * (1 + tolerance), before["p50_ms"] + min_ms):
+            regressions.append((name, before["p50_ms"], result["p50_ms"]))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description = __doc__, formatter_class = argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modules", type = int, default = 7000, help = "courses per synthetic AY catalog")
+    parser.add_argument("--years", type = int, default = 2, help = "AYs served by the stand-in")
+    parser.add_argument("--rows", type = int, nargs = "+", default = [100, 1000, 10000], help = "tracker sizes")
+    parser.add_argument("--runs", type = int, default = 20)
+    parser.add_argument("--max-seconds", type = float, default = 10.0, help = "time budget per stage (at least 3 runs)")
+    parser.add_argument("--latency", type = float, default = 0.0, help = "seconds of simulated network latency per request")
+    parser.add_argument("--only", nargs = "+", help = "run only stages whose name contains one of these")
+    parser.add_argument("--json", help = "write the results to this file")
+    parser.add_argument("--baseline", help = "results file to compare against (exits with 1 on a regression)")
+    parser.add_argument("--tolerance", type = float, default = 0.25)
+    args = parser.parse_args()
+
+    print(f"{'stage':<26}{'runs':>6}{'p50 ms':>11}{'p90 ms':>11}{'p99 ms':>11}{'max ms':>11}{'peak MB':>11}")
+    work_dir = tempfile.mkdtemp(prefix = "bench_suite_")
+    try:
+        results = run_suite(args, work_dir)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors = True)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"args": vars(args), "results": results}, f, indent = 2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f)["results"], args.tolerance)
+        for name, before, after in regressions:
+            print(f"REGRESSION {name}: p50 {before:.2f} ms -> {after:.2f} ms")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions over {args.tolerance:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""GPA summary benchmark: compares the vectorized gpa.summarize engine against the original
+per-grade boolean scans from calc() on synthetic trackers of 50 to 100k rows.
+
+    python benchmarks/bench_summary.py --sizes 50 1000 100000
+"""
+import argparse
+import os
+import sys
+import timeit
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from gpa import summarize
+from synthetic import make_tracker
+
+
+def legacy_summary(df):
+    # The analysis block from calc() before the summarize engine
+    df2 = df.dropna()
+    gpa = sum(df2["No. of CUs"] * df2["Grade Points"]) / sum(df2["No. of CUs"])
+    total_cus_gpa = sum(df2["No. of CUs"])
+    cus_not_counted = df.loc[(df["Grade"] == "U") | (df["Grade"] == "CU") | (df["Grade"] == "OVU") | (df["Grade"] == "OVI") | (df["Grade"] == "IC") | (df["Grade"] == "IP") | (df["Grade"] == "W")]
+    total_completed_cus = sum(df["No. of CUs"]) - sum(cus_not_counted["No. of CUs"])
+    sued_mods = len(df.loc[(df["Grade"] == "U") | (df["Grade"] == "S")])
+    cscu_mods = len(df.loc[(df["Grade"] == "CU") | (df["Grade"] == "CS") | (df["Grade"] == "OVU") | (df["Grade"] == "OVS")])
+    unrq_mods = len(df.loc[(df["Grade"] == "EXE") | (df["Grade"] == "IC") | (df["Grade"] == "OVI") | (df["Grade"] == "IP") | (df["Grade"] == "W")])
+
+    return gpa, total_cus_gpa, total_completed_cus, len(df), len(df2), sued_mods, cscu_mods, unrq_mods
+
+
+def best_of(func, repeat):
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat = repeat, number = number)) / number
+
+
+def main():
+    parser = argparse.ArgumentParser(description = __doc__, formatter_class = argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type = int, nargs = "+", default = [50, 500, 5000, 50000, 100000])
+    parser.add_argument("--repeat", type = int, default = 5)
+    args = parser.parse_args()
+
+    print(f"{'rows':>8} {'legacy (ms)':>12} {'summarize (ms)':>15} {'speedup':>8}")
+    for n in args.sizes:
+        df = make_tracker(n)
+
+        # Both implementations must agree before timing them
+        legacy = legacy_summary(df)
+        summary = summarize(df)
+        new = (summary.gpa, summary.gpa_cus, summary.completed_cus, summary.total_courses, summary.gpa_courses, summary.su_courses, summary.cscu_courses, summary.other_courses)
+        assert np.allclose(legacy, new), (legacy, new)
+
+        legacy_time = best_of(lambda: legacy_summary(df), args.repeat)
+        new_time = best_of(lambda: summarize(df), args.repeat)
+        print(f"{n:>8} {legacy_time * 1000:>12.3f} {new_time * 1000:>15.3f} {legacy_time / new_time:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
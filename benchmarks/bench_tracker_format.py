@@ -0,0 +1,74 @@
+"""Tracker file format benchmark: write time, read time and file size of the .xlsx workbook
+(export.to_excel / tracker.read_tracker_xlsx) against the Parquet file (export.to_parquet /
+tracker.read_tracker_parquet) on synthetic trackers of 1k to 1M rows.
+
+    python benchmarks/bench_tracker_format.py --sizes 1000 10000 100000 1000000 --xlsx-max 100000
+"""
+import argparse
+import io
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from export import to_excel, to_parquet
+from synthetic import academic_years, make_tracker, module_catalogs
+from tracker import read_tracker_parquet, read_tracker_xlsx
+
+
+def best_time(func, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+def check(df, back):
+    # Both formats must give back the same rows
+    assert list(back.columns) == list(df.columns)
+    for column in df.columns:
+        expected, actual = df[column].astype(object), back[column].astype(object)
+        if column in ("No. of CUs", "Grade Points"):
+            assert np.allclose(expected.astype(float), actual.astype(float), equal_nan = True), column
+        else:
+            assert (expected.where(expected.notna(), None) == actual.where(actual.notna(), None)).all(), column
+
+
+def main():
+    parser = argparse.ArgumentParser(description = __doc__, formatter_class = argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type = int, nargs = "+", default = [1000, 10000, 100000, 1000000])
+    parser.add_argument("--xlsx-max", type = int, default = 1000000, help = "largest tracker the .xlsx path is run on")
+    parser.add_argument("--repeat", type = int, default = 3)
+    parser.add_argument("--compression", default = "zstd", help = "Parquet compression codec")
+    args = parser.parse_args()
+
+    years = academic_years(6)
+    courses = module_catalogs(7000, years[-1:])[years[-1]]
+    rng = np.random.default_rng(0)
+
+    print(f"{'rows':>8} {'format':>8} {'write (ms)':>11} {'read (ms)':>10} {'size (KB)':>10} {'bytes/row':>10}")
+    for n in args.sizes:
+        df = make_tracker(n, courses = courses)
+        df["AY Taken"] = pd.Categorical(rng.choice([ay.replace("-", "/") for ay in years], size = n))
+        repeat = args.repeat if n <= 100000 else 1
+
+        formats = [("parquet", lambda: to_parquet(df, compression = args.compression), read_tracker_parquet)]
+        if n <= args.xlsx_max:
+            formats.insert(0, ("xlsx", lambda: to_excel(df), read_tracker_xlsx))
+
+        for name, write, read in formats:
+            write_time, data = best_time(write, repeat)
+            read_time, back = best_time(lambda: read(io.BytesIO(data)), repeat)
+            check(df, back)
+            print(f"{n:>8} {name:>8} {write_time * 1000:>11.1f} {read_time * 1000:>10.1f} {len(data) / 1024:>10.1f} {len(data) / n:>10.2f}", flush = True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""GPA trajectory benchmark: compares trajectory.gpa_trajectory against summarizing every student's
+tracker up to each AY with gpa.summarize, on synthetic cohorts of stacked trackers, then times adding
+one row to a tracker's running GPATrajectory against recomputing the trajectory from the whole tracker.
+
+    python benchmarks/bench_trajectory.py --students 10 100 1000 --rows 40
+"""
+import argparse
+import os
+import sys
+import timeit
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from gpa import summarize
+from synthetic import academic_years, make_tracker
+from tracker import GRADE_CODES
+from trajectory import GPATrajectory, gpa_trajectory
+
+
+def make_cohort(n_students, rows, n_years = 4, seed = 0):
+    # Stacked trackers with a "Student ID" column, each student's courses spread over n_years AYs
+    rng = np.random.default_rng(seed)
+    df = make_tracker(n_students * rows, seed = seed)
+    df.insert(0, "Student ID", np.repeat([f"A{i:07d}" for i in range(n_students)], rows))
+    df["AY Taken"] = rng.choice(academic_years(n_years, first = 2021), size = len(df))
+    return df
+
+
+def naive_trajectory(df):
+    # One full summary per student and AY prefix
+    out = []
+    for student, rows in df.groupby("Student ID", sort = True):
+        for ay in sorted(rows["AY Taken"].unique()):
+            summary = summarize(rows[rows["AY Taken"] <= ay].drop(columns = "Student ID"))
+            out.append((student, ay, summary.gpa, summary.gpa_cus, summary.completed_cus, summary.degree_class))
+    return out
+
+
+def best_of(func, repeat, number = None):
+    timer = timeit.Timer(func)
+    if number is None:
+        number, _ = timer.autorange()
+    return min(timer.repeat(repeat = repeat, number = number)) / number
+
+
+def main():
+    parser = argparse.ArgumentParser(description = __doc__, formatter_class = argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type = int, nargs = "+", default = [10, 100, 1000, 10000])
+    parser.add_argument("--rows", type = int, default = 40, help = "courses per student")
+    parser.add_argument("--naive-max", type = int, default = 1000, help = "largest cohort the per-prefix summaries are timed on")
+    parser.add_argument("--repeat", type = int, default = 3)
+    args = parser.parse_args()
+
+    print(f"{'students':>9} {'rows':>9} {'naive (ms)':>11} {'vectorized (ms)':>16} {'speedup':>8}")
+    for n in args.students:
+        df = make_cohort(n, args.rows)
+        trajectory = gpa_trajectory(df, student_column = "Student ID")
+
+        naive_time = None
+        if n <= args.naive_max:
+            # Both implementations must agree before timing them
+            naive = naive_trajectory(df)
+            assert len(naive) == len(trajectory)
+            for (student, ay, gpa, gpa_cus, completed, degree_class), row in zip(naive, trajectory.itertuples(index = False)):
+                assert (student, ay, degree_class) == (row[0], row[1], row[8]), (student, ay, row)
+                assert np.allclose([gpa, gpa_cus, completed], [row[5], row[6], row[7]], equal_nan = True), (student, ay, row)
+            naive_time = best_of(lambda: naive_trajectory(df), 1, number = 1)
+
+        vectorized_time = best_of(lambda: gpa_trajectory(df, student_column = "Student ID"), args.repeat)
+        naive_text = f"{naive_time * 1000:>11.1f}" if naive_time else f"{'-':>11}"
+        speedup = f"{naive_time / vectorized_time:>7.1f}x" if naive_time else f"{'-':>8}"
+        print(f"{n:>9} {len(df):>9} {naive_text} {vectorized_time * 1000:>16.3f} {speedup}")
+
+    # Incremental update: one row added to a single student's tracker, then the chart series read back
+    print(f"\n{'tracker rows':>12} {'recompute (ms)':>15} {'update + frame (ms)':>20}")
+    for n in (50, 500, 5000):
+        df = make_cohort(1, n).drop(columns = "Student ID")
+        running = GPATrajectory()
+        for row in df.itertuples(index = False):
+            running.update(row[5], GRADE_CODES.get(row[3], -1), row[2])
+        pd.testing.assert_frame_equal(running.frame(), gpa_trajectory(df), check_exact = False)
+
+        row = df.iloc[0].tolist()
+
+        def add_and_read():
+            running.update(row[5], GRADE_CODES.get(row[3], -1), row[2])
+            running.frame()
+
+        recompute_time = best_of(lambda: gpa_trajectory(df), args.repeat)
+        update_time = best_of(add_and_read, args.repeat)
+        print(f"{n:>12} {recompute_time * 1000:>15.3f} {update_time * 1000:>20.3f}")
+
+
+if __name__ == "__main__":
+    main()
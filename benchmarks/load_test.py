@@ -0,0 +1,253 @@
+"""Load driver: runs N concurrent simulated sessions of main.py in-process through Streamlit's AppTest,
+against the local NUSMods stand-in, and reports rerun latency percentiles, per-session session_state
+memory and process RSS for each session count, with an estimated per-replica capacity.
+
+Each session picks an AY, adds courses, uploads a tracker, views the analysis (which renders the PDF),
+and runs a forecast. AppTest cannot drive st.file_uploader, so the upload step runs the app's own
+ingest_upload on the session's tracker and then reruns, like the uploader's rerun would.
+
+AppTest swaps in a process-wide mock Runtime for every run, so script runs of different sessions
+cannot overlap: they queue on a lock, much like reruns contending for the GIL on a real server.
+The reported latency is queueing plus service time, and the service time alone is shown alongside.
+
+    python benchmarks/load_test.py --sessions 1 2 4 8 --slo-ms 500 --memory-mb 1024
+"""
+import argparse
+import array
+import collections
+import io
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+def rss_mb():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+
+
+def deep_sizeof(obj, seen = None):
+    # Approximate memory held by a session_state value, counting shared objects once
+    import pandas as pd
+
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        return int(obj.memory_usage(deep = True).sum()) if isinstance(obj, pd.DataFrame) else int(obj.memory_usage(deep = True))
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    if isinstance(obj, array.array):
+        return sys.getsizeof(obj)
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset, collections.deque)):
+        size += sum(deep_sizeof(item, seen) for item in obj)
+    elif hasattr(obj, "__dict__"):
+        size += deep_sizeof(vars(obj), seen)
+    return size
+
+
+# Only one AppTest script run at a time per process
+_RUN_LOCK = threading.Lock()
+
+
+class Session:
+    """One simulated user. Every AppTest run is timed as a rerun of the named step."""
+
+    def __init__(self, seed, courses, upload, timeout):
+        from streamlit.testing.v1 import AppTest
+
+        self.rng = random.Random(seed)
+        self.courses = courses
+        self.upload = upload
+        self.at = AppTest.from_file(os.path.join(ROOT, "main.py"), default_timeout = timeout)
+        self.latencies = []
+        self.service = []
+
+    def run(self, step):
+        start = time.perf_counter()
+        with _RUN_LOCK:
+            started = time.perf_counter()
+            self.at.run()
+            end = time.perf_counter()
+        self.latencies.append((step, end - start))
+        self.service.append(end - started)
+        if self.at.exception:
+            raise RuntimeError(f"{step}: {self.at.exception[0].value}")
+
+    def button(self, label):
+        return next(b for b in self.at.button if b.label.startswith(label))
+
+    def flow(self, n_courses):
+        at = self.at
+        self.run("first load")
+
+        # Pick an AY
+        ay = at.selectbox[0]
+        ay.set_value(self.rng.choice(ay.options[-4:]))
+        self.run("select AY")
+
+        # Search for and add courses
+        for _ in range(n_courses):
+            code = self.rng.choice(self.courses)
+            at.text_input[0].set_value(code[:-1])
+            self.run("search")
+            options = at.selectbox[1].options
+            if options:
+                # Options are shown as "<code> - <title> [<CUs> CUs]" labels
+                at.selectbox[1].set_value(self.rng.choice(options).split(" - ", 1)[0])
+            at.selectbox[2].set_value(self.rng.choice(["A", "A-", "B+", "B", "C", "S"]))
+            self.button("Add Course").click()
+            self.run("add course")
+
+        # Upload a tracker
+        from main import get_initial_data
+        from tracker import ingest_upload
+
+        tracker = at.session_state["tracker"]
+        start = time.perf_counter()
+        catalog = get_initial_data(at.selectbox[0].value[3:].replace("/", "-"))
+        ingested = ingest_upload(io.BytesIO(self.upload), catalog, tracker.to_frame())
+        tracker.extend(ingested.rows.values.tolist())
+        self.latencies.append(("upload ingest", time.perf_counter() - start))
+        self.service.append(time.perf_counter() - start)
+        self.run("upload")
+
+        # View the analysis and PDF
+        self.button("View Analysis").click()
+        self.run("view analysis")
+        if not any(b.label == "Download as PDF" for b in at.get("download_button")):
+            raise RuntimeError("view analysis: no PDF download")
+
+        # Forecast
+        at.sidebar.radio[0].set_value("Future GPA Forecast")
+        self.run("open forecast")
+        for code in self.rng.sample(self.courses, 4):
+            at.text_input[0].set_value(code)
+            self.run("forecast search")
+            if any(label.startswith(code + " - ") for label in at.multiselect[0].options):
+                at.multiselect[0].select(code)
+                self.run("forecast select")
+        self.button("Get GPA Forecast").click()
+        self.run("forecast")
+
+    def state_bytes(self):
+        return deep_sizeof(self.at.session_state.filtered_state)
+
+
+def run_level(n, args, courses, upload):
+    sessions = [Session(args.seed + i, courses, upload, args.timeout) for i in range(n)]
+    barrier = threading.Barrier(n)
+
+    def drive(session):
+        barrier.wait()
+        session.flow(args.courses)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers = n) as pool:
+        for future in [pool.submit(drive, session) for session in sessions]:
+            future.result()
+    elapsed = time.perf_counter() - start
+
+    latencies = np.array([seconds for session in sessions for _, seconds in session.latencies]) * 1000
+    service = np.array([seconds for session in sessions for seconds in session.service]) * 1000
+    by_step = collections.defaultdict(list)
+    for session in sessions:
+        for step, seconds in session.latencies:
+            by_step[step].append(seconds * 1000)
+
+    state = [session.state_bytes() for session in sessions]
+    # Keep the sessions alive until RSS has been read
+    rss = rss_mb()
+    del sessions
+
+    return {"sessions": n, "reruns": len(latencies), "elapsed": elapsed,
+            "p50": np.percentile(latencies, 50), "p90": np.percentile(latencies, 90), "p99": np.percentile(latencies, 99),
+            "max": latencies.max(), "service_p50": np.percentile(service, 50), "state_kb": np.mean(state) / 1024, "rss_mb": rss, "by_step": by_step}
+
+
+def capacity(levels, slo_ms, memory_mb):
+    """Largest tested session count within the latency SLO, and the session count the memory budget allows.
+    Memory per session is the RSS slope between the smallest and largest session counts (one-time loads such
+    as the catalogs and Plotly land in the first level), and at least the measured session_state size.
+    """
+    within_slo = [level["sessions"] for level in levels if level["p90"] <= slo_ms]
+    first, last = levels[0], levels[-1]
+    per_session = last["state_kb"] / 1024
+    if last["sessions"] > first["sessions"]:
+        per_session = max(per_session, (last["rss_mb"] - first["rss_mb"]) / (last["sessions"] - first["sessions"]))
+    fixed = first["rss_mb"] - first["sessions"] * per_session
+
+    return (max(within_slo) if within_slo else 0), int((memory_mb - fixed) / per_session), per_session, fixed
+
+
+def main():
+    parser = argparse.ArgumentParser(description = __doc__, formatter_class = argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type = int, nargs = "+", default = [1, 2, 4, 8], help = "concurrent session counts to test")
+    parser.add_argument("--modules", type = int, default = 7000)
+    parser.add_argument("--courses", type = int, default = 6, help = "courses added by hand per session")
+    parser.add_argument("--upload-rows", type = int, default = 40)
+    parser.add_argument("--latency", type = float, default = 0.0, help = "seconds of simulated NUSMods latency per request")
+    parser.add_argument("--slo-ms", type = float, default = 500.0, help = "p90 rerun latency target")
+    parser.add_argument("--memory-mb", type = float, default = 1024.0, help = "memory limit of one replica")
+    parser.add_argument("--timeout", type = float, default = 120.0)
+    parser.add_argument("--seed", type = int, default = 0)
+    parser.add_argument("--steps", action = "store_true", help = "also print latency percentiles per step")
+    args = parser.parse_args()
+
+    # The app reads these at import, so they are set before anything from the app is imported
+    os.environ["NUS_GPA_CACHE_DIR"] = tempfile.mkdtemp(prefix = "load_test_")
+    from nusmods_stub import NUSModsStub, synthetic_payloads
+    from catalog import academic_years
+    from synthetic import make_tracker, module_catalogs, tracker_xlsx
+
+    now = time.localtime()
+    years = academic_years(now.tm_year, time.strftime("%m-%d", now))
+    server = NUSModsStub(synthetic_payloads(args.modules, years), delay = args.latency).start()
+    import catalog
+    catalog.NUSMODS_API = server.url
+
+    latest = module_catalogs(args.modules, years)[years[-1]]
+    courses = [c["moduleCode"] for c in latest if float(c["moduleCredit"]) > 0]
+    upload = tracker_xlsx(make_tracker(args.upload_rows, seed = args.seed, courses = latest))
+
+    baseline_rss = rss_mb()
+    print(f"Stand-in at {server.url} with {len(years)} AYs of {args.modules} courses, baseline RSS {baseline_rss:.1f} MB")
+    print(f"{'sessions':>8}{'reruns':>8}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}{'svc p50':>10}{'state KB':>10}{'RSS MB':>10}{'wall s':>8}")
+
+    levels = []
+    for n in args.sessions:
+        level = run_level(n, args, courses, upload)
+        levels.append(level)
+        print(f"{n:>8}{level['reruns']:>8}{level['p50']:>10.1f}{level['p90']:>10.1f}{level['p99']:>10.1f}{level['max']:>10.1f}"
+              f"{level['service_p50']:>10.1f}{level['state_kb']:>10.1f}{level['rss_mb']:>10.1f}{level['elapsed']:>8.1f}", flush = True)
+        if args.steps:
+            for step, values in level["by_step"].items():
+                p50, p90 = np.percentile(values, [50, 90])
+                print(f"{'':>8}  {step:<18}{len(values):>6}{p50:>10.1f}{p90:>10.1f}")
+
+    server.shutdown()
+
+    slo_sessions, memory_sessions, per_session, fixed = capacity(levels, args.slo_ms, args.memory_mb)
+    print(f"Memory: {fixed:.1f} MB fixed + {per_session:.2f} MB per session")
+    print(f"Capacity per replica: {slo_sessions} concurrent sessions within p90 <= {args.slo_ms:.0f} ms (largest tested {args.sessions[-1]}), "
+          f"~{memory_sessions} sessions within {args.memory_mb:.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Local stand-in for the NUSMods API: serves synthetic /<AY>/moduleInfo.json payloads with ETag and
+Last-Modified validators (answering conditional requests with 304), so catalog loading can be exercised offline.
+Point the app at it with NUS_GPA_NUSMODS_API.
+
+    python benchmarks/nusmods_stub.py --port 8765 --modules 7000 --years 9
+    NUS_GPA_NUSMODS_API=http://127.0.0.1:8765 streamlit run main.py
+"""
+import argparse
+import email.utils
+import hashlib
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from catalog import academic_years as app_years
+from synthetic import module_catalogs, module_info_json
+
+
+class NUSModsStub(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, payloads, port = 0, delay = 0.0):
+        self.payloads = payloads
+        self.etags = {ay: '"' + hashlib.sha256(raw).hexdigest()[:16] + '"' for ay, raw in payloads.items()}
+        self.last_modified = email.utils.formatdate(time.time(), usegmt = True)
+        self.delay = delay
+        self.requests = 0
+        super().__init__(("127.0.0.1", port), _Handler)
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def start(self):
+        # Serves from a daemon thread until shutdown()
+        threading.Thread(target = self.serve_forever, name = "nusmods-stub", daemon = True).start()
+        return self
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        server = self.server
+        server.requests += 1
+        parts = self.path.strip("/").split("/")
+        if len(parts) != 2 or parts[1] != "moduleInfo.json" or parts[0] not in server.payloads:
+            self.send_error(404)
+            return
+
+        if server.delay:
+            time.sleep(server.delay)
+
+        ay = parts[0]
+        if self.headers.get("If-None-Match") == server.etags[ay]:
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        body = server.payloads[ay]
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", server.etags[ay])
+        self.send_header("Last-Modified", server.last_modified)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def synthetic_payloads(n_modules, years, seed = 0):
+    return {ay: module_info_json(courses) for ay, courses in module_catalogs(n_modules, years, seed = seed).items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description = __doc__, formatter_class = argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type = int, default = 8765)
+    parser.add_argument("--modules", type = int, default = 7000)
+    parser.add_argument("--years", type = int, default = None, help = "number of AYs ending with the current one (default: every AY the app offers)")
+    parser.add_argument("--delay", type = float, default = 0.0, help = "seconds added to every response")
+    args = parser.parse_args()
+
+    now = time.localtime()
+    years = app_years(now.tm_year, time.strftime("%m-%d", now))
+    years = years[-args.years:] if args.years else years
+
+    server = NUSModsStub(synthetic_payloads(args.modules, years), port = args.port, delay = args.delay)
+    print(f"Serving {len(years)} AYs ({years[0]} to {years[-1]}) of {args.modules} courses at {server.url}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
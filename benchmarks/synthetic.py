@@ -0,0 +1,104 @@
+"""Synthetic data for the benchmarks: NUSMods moduleInfo.json payloads for consecutive AYs, where each
+AY drops, adds and renames a small share of the previous AY's courses like the real catalog does,
+and Course Tracker frames and workbooks of any size.
+"""
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gpa import EXPECTED_HEADERS, GRADES, GRADES_TO_GPA
+
+
+PREFIXES = ["CS", "MA", "ST", "EC", "GE", "LSM", "PC", "CM", "ACC", "FIN", "IS", "EE", "ME", "PL", "HY"]
+WORDS = ["Introduction", "Programming", "Data", "Structures", "Algorithms", "Calculus", "Linear", "Algebra",
+         "Statistics", "Economics", "Principles", "Modern", "Physics", "Chemistry", "Systems", "Design",
+         "Analysis", "Theory", "Methods", "Applied", "Advanced", "Topics", "Society", "Networks", "Finance"]
+CREDITS = [4, 4, 4, 4, 2, 0, 6, 8]
+
+
+def _title(rng):
+    return " ".join(rng.choice(WORDS, size = rng.integers(2, 6)).tolist())
+
+
+def _course(rng, code):
+    return {"moduleCode": code, "title": _title(rng), "moduleCredit": str(int(rng.choice(CREDITS)))}
+
+
+def academic_years(n, first = 2018):
+    return [f"{yr}-{yr+1}" for yr in range(first, first + n)]
+
+
+def module_catalogs(n_modules, years, churn = 0.03, seed = 0):
+    """{AY: [course dicts]} for each AY, sorted by course code like NUSMods.
+    Every AY removes and adds `churn` of the courses and changes the title or CUs of another `churn`.
+    """
+    rng = np.random.default_rng(seed)
+    courses = {}
+    while len(courses) < n_modules:
+        code = f"{rng.choice(PREFIXES)}{rng.integers(1000, 9000)}"
+        courses[code] = _course(rng, code)
+
+    catalogs = {}
+    for i, rel_years in enumerate(years):
+        if i > 0:
+            n_churn = int(len(courses) * churn)
+            codes = sorted(courses)
+            for code in rng.choice(codes, size = n_churn, replace = False).tolist():
+                del courses[code]
+            while len(courses) < n_modules:
+                code = f"{rng.choice(PREFIXES)}{rng.integers(1000, 9000)}"
+                courses.setdefault(code, _course(rng, code))
+            for code in rng.choice(sorted(courses), size = n_churn, replace = False).tolist():
+                changed = dict(courses[code])
+                if rng.random() < 0.5:
+                    changed["title"] = _title(rng)
+                else:
+                    changed["moduleCredit"] = str(int(rng.choice(CREDITS)))
+                courses[code] = changed
+        catalogs[rel_years] = [dict(courses[code]) for code in sorted(courses)]
+
+    return catalogs
+
+
+def module_info_json(courses):
+    # Real payloads carry much more per course than the app reads
+    return json.dumps([dict(course, description = "Synthetic course description. " * 8, semesterData = [{"semester": 1}, {"semester": 2}])
+                       for course in courses]).encode("utf-8")
+
+
+def make_tracker(n, seed = 0, courses = None):
+    """Course Tracker frame of n rows, drawing course codes, titles and CUs from `courses` (course dicts) if given."""
+    rng = np.random.default_rng(seed)
+    grades = rng.choice(GRADES, size = n)
+    if courses:
+        picked = [courses[i] for i in rng.integers(0, len(courses), size = n)]
+        codes = [c["moduleCode"] for c in picked]
+        titles = [c["title"] for c in picked]
+        cus = [float(c["moduleCredit"]) for c in picked]
+    else:
+        codes = [f"CS{i % 10000:04d}" for i in range(n)]
+        titles = "Synthetic Course"
+        cus = rng.choice([2.0, 4.0, 4.0, 4.0, 6.0, 8.0], size = n)
+
+    df = pd.DataFrame({
+        "Course Code": codes,
+        "Course Title": titles,
+        "No. of CUs": cus,
+        "Grade": grades,
+        "Grade Points": [GRADES_TO_GPA[g] for g in grades],
+        "AY Taken": "2024/2025"
+    }, columns = EXPECTED_HEADERS)
+    df["Grade"] = pd.Categorical(df["Grade"], categories = GRADES)
+
+    return df
+
+
+def tracker_xlsx(df):
+    # Written with the app's own exporter, so uploads round trip exactly like a downloaded tracker
+    from export import to_excel
+    return to_excel(df)
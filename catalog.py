@@ -0,0 +1,709 @@
+import bisect
+import copy
+import hashlib
+import json
+import mmap
+import re
+import os
+import struct
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import requests
+
+from http_client import get_session
+
+
+NUSMODS_API = os.environ.get("NUS_GPA_NUSMODS_API", "https://api.nusmods.com/v2")
+
+# On-disk cache settings (can be overridden through environment variables)
+CACHE_DIR = os.environ.get("NUS_GPA_CACHE_DIR", os.path.join(tempfile.gettempdir(), "nus_gpa_insight"))
+CACHE_TTL = float(os.environ.get("NUS_GPA_CACHE_TTL", 6 * 60 * 60))
+CACHE_MAX_BYTES = int(os.environ.get("NUS_GPA_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+
+
+def _cache_paths(rel_years, cache_dir):
+    return os.path.join(cache_dir, f"moduleInfo_{rel_years}.json"), os.path.join(cache_dir, f"moduleInfo_{rel_years}.meta.json")
+
+
+def _read_meta(meta_path):
+    try:
+        with open(meta_path, "r", encoding = "utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _atomic_write(path, data):
+    # Write to a temporary file first so concurrent readers never see a partial file
+    fd, tmp_path = tempfile.mkstemp(dir = os.path.dirname(path), suffix = ".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+# Files of one AY in the cache directory: the payload, its metadata and its compiled catalog files (of any format version)
+_CACHE_FILE_RE = re.compile(r"^(?:moduleInfo_(?P<payload>.+?)(?P<meta>\.meta)?\.json|catalog_(?P<compiled>.+?)(?:\.credits)?\.v\d+\.bin)$")
+
+
+def _evict(cache_dir, max_bytes, keep):
+    # Each AY's payload, metadata and compiled catalog files are counted and removed together, least recently
+    # used payload first. Compiled files whose payload is gone can no longer be validated, so they go first.
+    groups = {}
+    for name in os.listdir(cache_dir):
+        match = _CACHE_FILE_RE.match(name)
+        if match is None:
+            continue
+        path = os.path.join(cache_dir, name)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        rel_years = match.group("payload") or match.group("compiled")
+        group = groups.setdefault(rel_years, {"last_used": None, "size": 0, "paths": []})
+        if match.group("payload") and not match.group("meta"):
+            group["last_used"] = stat.st_mtime
+        group["size"] += stat.st_size
+        group["paths"].append(path)
+
+    total = sum(group["size"] for group in groups.values())
+    for rel_years, group in sorted(groups.items(), key = lambda item: (item[1]["last_used"] is not None, item[1]["last_used"] or 0)):
+        if total <= max_bytes:
+            break
+        if rel_years == keep:
+            continue
+        for path in group["paths"]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        total -= group["size"]
+
+
+def _check_payload(raw):
+    # Raises ValueError unless raw decodes into modules with the fields the catalogs keep
+    try:
+        for course in iter_modules(raw):
+            course["moduleCode"], course["title"], float(course["moduleCredit"])
+    except (KeyError, TypeError) as e:
+        raise ValueError(f"Invalid moduleInfo.json ({e!r})") from e
+
+
+def fetch_module_info(rel_years, cache_dir = None, ttl = None, max_bytes = None, session = None, api = None):
+    """Returns the raw moduleInfo.json bytes for an AY (e.g. "2024-2025"), served from a persistent
+    on-disk cache which is revalidated with If-None-Match/If-Modified-Since once older than the TTL.
+    A stale copy is served if NUSMods cannot be reached or sends a payload which does not decode.
+    """
+    cache_dir = CACHE_DIR if cache_dir is None else cache_dir
+    ttl = CACHE_TTL if ttl is None else ttl
+    max_bytes = CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    http = get_session() if session is None else session
+    api = NUSMODS_API if api is None else api
+
+    os.makedirs(cache_dir, exist_ok = True)
+    data_path, meta_path = _cache_paths(rel_years, cache_dir)
+    meta = _read_meta(meta_path) if os.path.exists(data_path) else None
+
+    def read_cached():
+        # Touching the payload marks it as recently used for eviction
+        os.utime(data_path)
+        with open(data_path, "rb") as f:
+            return f.read()
+
+    # Fresh copy on disk, no network needed
+    if meta is not None and time.time() - meta.get("fetched_at", 0) < ttl:
+        return read_cached()
+
+    headers = {}
+    if meta is not None:
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+
+    try:
+        response = http.get(f"{api}/{rel_years}/moduleInfo.json", headers = headers)
+        if response.status_code == 304 and meta is not None:
+            content = read_cached()
+        else:
+            response.raise_for_status()
+            content = response.content
+            # A truncated or non-JSON body must not replace the cached copy (or be served as fresh for the TTL)
+            _check_payload(content)
+            meta = {"etag": response.headers.get("ETag"),
+                    "last_modified": response.headers.get("Last-Modified"),
+                    "sha256": hashlib.sha256(content).hexdigest()}
+            _atomic_write(data_path, content)
+    except (requests.RequestException, OSError, ValueError):
+        # Serve stale on error
+        if meta is not None:
+            return read_cached()
+        raise
+
+    meta["fetched_at"] = time.time()
+    _atomic_write(meta_path, json.dumps(meta).encode("utf-8"))
+    _evict(cache_dir, max_bytes, keep = rel_years)
+
+    return content
+
+
+def load_module_info(rel_years, **kwargs):
+    return json.loads(fetch_module_info(rel_years, **kwargs))
+
+
+def iter_modules(raw):
+    # Incrementally decodes one module object at a time from a moduleInfo.json array,
+    # so the full list of dicts (descriptions, prerequisites, workload etc.) is never held at once
+    text = raw.decode("utf-8") if isinstance(raw, (bytes, bytearray)) else raw
+    decoder = json.JSONDecoder()
+    ws = " \t\n\r"
+
+    end = len(text)
+
+    def skip_ws(pos):
+        while pos < end and text[pos] in ws:
+            pos += 1
+        return pos
+
+    pos = skip_ws(0)
+    if text[pos:pos+1] != "[":
+        raise ValueError("Expected a JSON array of modules")
+    pos = skip_ws(pos + 1)
+    if text[pos:pos+1] == "]":
+        pos += 1
+    else:
+        while True:
+            if pos >= end:
+                raise ValueError("Truncated moduleInfo.json")
+            if text[pos] == ",":
+                raise ValueError(f"Unexpected ',' at position {pos} of moduleInfo.json")
+            try:
+                obj, pos = decoder.raw_decode(text, pos)
+            except json.JSONDecodeError as e:
+                if skip_ws(e.pos) >= end:
+                    raise ValueError("Truncated moduleInfo.json") from e
+                raise
+            yield obj
+
+            pos = skip_ws(pos)
+            if pos >= end:
+                raise ValueError("Truncated moduleInfo.json")
+            if text[pos] == "]":
+                pos += 1
+                break
+            if text[pos] != ",":
+                raise ValueError(f"Expected ',' or ']' at position {pos} of moduleInfo.json")
+            pos = skip_ws(pos + 1)
+
+    if skip_ws(pos) != end:
+        raise ValueError(f"Extra data at position {pos} of moduleInfo.json")
+
+
+class Catalog:
+    """Projected, column-oriented view of moduleInfo.json keeping only the course code, title and CUs.
+    Codes are a NumPy unicode array, titles are interned strings and CUs are a float32 array.
+    """
+
+    __slots__ = ("codes", "titles", "credits", "_index", "_with_credits", "_search_index")
+
+    def __init__(self, codes, titles, credits):
+        self.codes = np.asarray(codes, dtype = str)
+        self.titles = tuple(titles)
+        self.credits = np.asarray(credits, dtype = np.float32)
+        self._index = {code: i for i, code in enumerate(codes.tolist() if isinstance(codes, np.ndarray) else codes)}
+        self._with_credits = None
+        self._search_index = None
+
+    @classmethod
+    def from_json(cls, raw):
+        codes, titles, credits = [], [], []
+        for course in iter_modules(raw):
+            codes.append(sys.intern(course["moduleCode"]))
+            titles.append(sys.intern(course["title"]))
+            credits.append(float(course["moduleCredit"]))
+
+        return cls(codes, titles, credits)
+
+    def __len__(self):
+        return len(self.titles)
+
+    def __contains__(self, code):
+        return code in self._index
+
+    def __iter__(self):
+        return iter(self._index)
+
+    def index(self, code):
+        return self._index[code]
+
+    def title(self, code):
+        return self.titles[self.index(code)]
+
+    def cus(self, code):
+        return float(self.credits[self.index(code)])
+
+    def __getitem__(self, code):
+        # Same [title, CUs] shape as the old cu_dict values
+        i = self.index(code)
+        return [self.titles[i], float(self.credits[i])]
+
+    def with_credits(self):
+        # Courses which carry CUs (used for GPA forecasting), built once per catalog
+        if self._with_credits is None:
+            mask = self.credits != 0
+            self._with_credits = Catalog(self.codes[mask].tolist(), [t for t, m in zip(self.titles, mask) if m], self.credits[mask])
+        return self._with_credits
+
+    def labels(self):
+        # Display labels of the course pickers, in catalog order
+        return [f"{code} - {title} [{cus} CUs]" for code, title, cus in zip(self, self.titles, self.credits.tolist())]
+
+    @property
+    def search_index(self):
+        # Built lazily on first use and then kept alongside the catalog
+        if self._search_index is None:
+            self._search_index = SearchIndex(self)
+        return self._search_index
+
+    def nbytes(self):
+        return self.codes.nbytes + self.credits.nbytes + sum(sys.getsizeof(t) for t in self.titles) + sys.getsizeof(self._index)
+
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+class SearchIndex:
+    """Prefix/token search over a Catalog, with display labels precomputed once per AY."""
+
+    def __init__(self, catalog):
+        self.catalog = catalog
+        self.labels = dict(zip(catalog, catalog.labels()))
+        self.mask = None
+
+        # Sorted upper-case codes for code prefix lookup
+        codes = list(catalog)
+        self._code_order = sorted(range(len(codes)), key = lambda i: codes[i].upper())
+        self._sorted_codes = [codes[i].upper() for i in self._code_order]
+
+        # Sorted title token vocabulary for token prefix lookup, each with a posting list of course indices
+        postings = {}
+        for i, title in enumerate(catalog.titles):
+            for token in set(_TOKEN_RE.findall(title.lower())):
+                postings.setdefault(token, []).append(i)
+        self._tokens = sorted(postings)
+        self._postings = [postings[t] for t in self._tokens]
+
+    @classmethod
+    def mapped(cls, catalog, code_order, tokens, postings):
+        # Index sections read straight from a compiled catalog file, with labels formatted on demand
+        index = cls.__new__(cls)
+        index.catalog = catalog
+        index.labels = None
+        index.mask = None
+        index._code_order = code_order
+        index._sorted_codes = _UpperCodes(catalog.codes, code_order)
+        index._tokens = tokens
+        index._postings = postings
+        return index
+
+    def restricted(self, mask):
+        # The same index searching only the courses where mask is set (e.g. those carrying CUs)
+        index = copy.copy(self)
+        index.mask = mask
+        return index
+
+    def label(self, code):
+        if self.labels is None:
+            title, cus = self.catalog[code]
+            return f"{code} - {title} [{cus} CUs]"
+        return self.labels[code]
+
+    def _code_prefix(self, prefix):
+        prefix = prefix.upper()
+        lo = bisect.bisect_left(self._sorted_codes, prefix)
+        hi = bisect.bisect_left(self._sorted_codes, prefix + "\uffff")
+        return self._code_order[lo:hi]
+
+    def _token_prefix(self, prefix):
+        lo = bisect.bisect_left(self._tokens, prefix)
+        hi = bisect.bisect_left(self._tokens, prefix + "\uffff")
+        matches = set()
+        for postings in self._postings[lo:hi]:
+            matches.update(postings)
+        return matches
+
+    def search(self, query, limit = 50):
+        """Returns up to `limit` course codes matching the query, ranked by exact code, code prefix
+        and then title tokens (every query word must prefix-match a word of the title).
+        """
+        codes = self.catalog.codes
+        mask = self.mask
+        query = query.strip()
+        results = []
+        seen = set()
+
+        def add(indices):
+            for i in indices:
+                if len(results) >= limit:
+                    return
+                if i not in seen and (mask is None or mask[i]):
+                    seen.add(i)
+                    results.append(i)
+
+        if not query:
+            add(self._code_order)
+            return [str(codes[i]) for i in results]
+
+        if query.upper() in self.catalog:
+            add([self.catalog.index(query.upper())])
+        add(self._code_prefix(query.replace(" ", "")))
+
+        words = _TOKEN_RE.findall(query.lower())
+        if words and len(results) < limit:
+            matches = None
+            for word in words:
+                found = self._token_prefix(word)
+                matches = found if matches is None else matches & found
+                if not matches:
+                    break
+            if matches:
+                add(sorted(matches, key = lambda i: codes[i]))
+
+        return [str(codes[i]) for i in results]
+
+
+def load_catalog(rel_years, **kwargs):
+    return Catalog.from_json(fetch_module_info(rel_years, **kwargs))
+
+
+# Compiled catalog files: bump FORMAT_VERSION whenever the layout below changes
+MAGIC = b"NUSGPACT"
+FORMAT_VERSION = 2
+_HEADER = struct.Struct("<8sII32sII")
+_SECTIONS = ["codes", "title_offsets", "titles", "credits", "code_order", "token_offsets", "tokens", "posting_offsets", "postings", "credit_positions"]
+_SECTION_TABLE = struct.Struct("<" + "QQ" * len(_SECTIONS))
+
+
+class _Ragged:
+    # Read-only sequence of variable length items stored as an offsets array and a flat buffer
+    __slots__ = ("offsets", "data", "decode")
+
+    def __init__(self, offsets, data, decode = None):
+        self.offsets = offsets
+        self.data = data
+        self.decode = decode
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def _item(self, i):
+        item = self.data[self.offsets[i]:self.offsets[i+1]]
+        return item if self.decode is None else self.decode(item)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self._item(j) for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return self._item(i)
+
+    def __iter__(self):
+        return (self._item(i) for i in range(len(self)))
+
+
+class _UpperCodes:
+    # Upper-case codes in code_order, for bisecting without building the sorted list
+    __slots__ = ("codes", "order")
+
+    def __init__(self, codes, order):
+        self.codes = codes
+        self.order = order
+
+    def __len__(self):
+        return len(self.order)
+
+    def __getitem__(self, i):
+        return str(self.codes[self.order[i]]).upper()
+
+
+class _Take:
+    # Read-only sequence of the items of a sequence at the given positions
+    __slots__ = ("items", "positions")
+
+    def __init__(self, items, positions):
+        self.items = items
+        self.positions = positions
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __getitem__(self, i):
+        return self.items[int(self.positions[i])]
+
+    def __iter__(self):
+        return (self.items[i] for i in self.positions.tolist())
+
+
+def _ragged_sections(items):
+    offsets = np.zeros(len(items) + 1, dtype = "<u4")
+    offsets[1:] = np.cumsum([len(item) for item in items])
+    return offsets.tobytes()
+
+
+def write_catalog_file(path, catalog, source_digest = b""):
+    """Compiles a catalog and its search index into a versioned binary file which MappedCatalog memory-maps.
+    Courses are stored sorted by code so lookups are a binary search over the mapped codes.
+    """
+    order = sorted(range(len(catalog)), key = lambda i: catalog.codes[i])
+    codes = [str(catalog.codes[i]) for i in order]
+    ordered = Catalog(codes, [catalog.titles[i] for i in order], np.asarray(catalog.credits)[order])
+    index = SearchIndex(ordered)
+
+    titles = [title.encode("utf-8") for title in ordered.titles]
+    tokens = [token.encode("utf-8") for token in index._tokens]
+    width = max([len(code) for code in codes], default = 1)
+
+    sections = {
+        "codes": np.array(codes, dtype = f"<U{width}").tobytes(),
+        "title_offsets": _ragged_sections(titles),
+        "titles": b"".join(titles),
+        "credits": ordered.credits.astype("<f4").tobytes(),
+        "code_order": np.array(index._code_order, dtype = "<i4").tobytes(),
+        "token_offsets": _ragged_sections(tokens),
+        "tokens": b"".join(tokens),
+        "posting_offsets": _ragged_sections(index._postings),
+        "postings": np.array([i for postings in index._postings for i in postings], dtype = "<i4").tobytes(),
+        # Positions of the courses which carry CUs, so with_credits() needs no second copy of the catalog
+        "credit_positions": np.flatnonzero(ordered.credits != 0).astype("<i4").tobytes()
+    }
+
+    # Sections start on 8 byte boundaries after the header and section table
+    out = bytearray(_HEADER.size + _SECTION_TABLE.size)
+    table = []
+    for name in _SECTIONS:
+        out += b"\0" * (-len(out) % 8)
+        table += [len(out), len(sections[name])]
+        out += sections[name]
+
+    _HEADER.pack_into(out, 0, MAGIC, FORMAT_VERSION, len(codes), source_digest.ljust(32, b"\0"), width, len(tokens))
+    _SECTION_TABLE.pack_into(out, _HEADER.size, *table)
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok = True)
+    _atomic_write(path, bytes(out))
+
+
+def read_catalog_header(path):
+    """(format version, source digest) of a compiled catalog file, or None if it is missing or not one"""
+    try:
+        with open(path, "rb") as f:
+            header = f.read(_HEADER.size)
+    except OSError:
+        return None
+    if len(header) < _HEADER.size or header[:len(MAGIC)] != MAGIC:
+        return None
+    _, version, _, digest, _, _ = _HEADER.unpack(header)
+    return version, digest
+
+
+class MappedCatalog(Catalog):
+    """Catalog read in place from a compiled catalog file mapped read-only into memory.
+    Nothing is parsed or copied, so every process mapping the same file shares its pages.
+    """
+
+    __slots__ = ("path", "_mmap", "_credit_positions")
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access = mmap.ACCESS_READ)
+
+        magic, version, n, _, width, n_tokens = _HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"{path} is not a version {FORMAT_VERSION} compiled catalog")
+        table = _SECTION_TABLE.unpack_from(self._mmap, _HEADER.size)
+        buffer = memoryview(self._mmap)
+        sections = {name: buffer[table[2*i]:table[2*i] + table[2*i+1]] for i, name in enumerate(_SECTIONS)}
+
+        def section(name, dtype):
+            return np.frombuffer(sections[name], dtype = dtype)
+
+        self.path = path
+        self.codes = section("codes", f"<U{width}")
+        self.titles = _Ragged(section("title_offsets", "<u4"), sections["titles"], lambda b: str(b, "utf-8"))
+        self.credits = section("credits", "<f4")
+        self._index = None
+        self._with_credits = None
+        self._credit_positions = section("credit_positions", "<i4")
+        self._search_index = SearchIndex.mapped(self, section("code_order", "<i4"),
+                                                _Ragged(section("token_offsets", "<u4"), sections["tokens"], lambda b: str(b, "utf-8")),
+                                                _Ragged(section("posting_offsets", "<u4"), section("postings", "<i4")))
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __contains__(self, code):
+        i = int(np.searchsorted(self.codes, code))
+        return i < len(self.codes) and self.codes[i] == code
+
+    def __iter__(self):
+        return (str(code) for code in self.codes)
+
+    def index(self, code):
+        i = int(np.searchsorted(self.codes, code))
+        if i >= len(self.codes) or self.codes[i] != code:
+            raise KeyError(code)
+        return i
+
+    def with_credits(self):
+        if self._with_credits is None:
+            self._with_credits = MappedSubset(self, self._credit_positions)
+        return self._with_credits
+
+    def nbytes(self):
+        # Mapped pages are shared page cache rather than process memory
+        return 0
+
+    def mapped_bytes(self):
+        return len(self._mmap)
+
+
+class MappedSubset(Catalog):
+    """Courses of a MappedCatalog at the given (sorted) positions, read through the parent's mapping.
+    Only a mask over the parent is kept, and searches go through the parent's index restricted to it.
+    """
+
+    __slots__ = ("parent", "positions", "_mask")
+
+    def __init__(self, parent, positions):
+        self.parent = parent
+        self.positions = positions
+        self._mask = np.zeros(len(parent), dtype = bool)
+        self._mask[positions] = True
+        self.codes = _Take(parent.codes, positions)
+        self.titles = _Take(parent.titles, positions)
+        self.credits = _Take(parent.credits, positions)
+        self._index = None
+        self._with_credits = None
+        self._search_index = parent.search_index.restricted(self._mask)
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __contains__(self, code):
+        return code in self.parent and bool(self._mask[self.parent.index(code)])
+
+    def __iter__(self):
+        return (str(self.parent.codes[i]) for i in self.positions.tolist())
+
+    def index(self, code):
+        # Position within the subset, which keeps the parent's code order
+        j = self.parent.index(code)
+        i = int(np.searchsorted(self.positions, j))
+        if i >= len(self.positions) or self.positions[i] != j:
+            raise KeyError(code)
+        return i
+
+    def with_credits(self):
+        return self
+
+    def labels(self):
+        return [f"{code} - {title} [{cus} CUs]" for code, title, cus in zip(self, self.titles, self.credits)]
+
+    def nbytes(self):
+        return self._mask.nbytes
+
+
+def compiled_catalog_path(rel_years, cache_dir):
+    return os.path.join(cache_dir, f"catalog_{rel_years}.v{FORMAT_VERSION}.bin")
+
+
+def load_mapped_catalog(rel_years, cache_dir = None, **kwargs):
+    """Catalog of an AY memory-mapped from its compiled file, which is (re)compiled only when missing,
+    from an older format or built from a different moduleInfo.json.
+    """
+    cache_dir = CACHE_DIR if cache_dir is None else cache_dir
+    raw = fetch_module_info(rel_years, cache_dir = cache_dir, **kwargs)
+    digest = hashlib.sha256(raw).digest()
+    path = compiled_catalog_path(rel_years, cache_dir)
+
+    if read_catalog_header(path) != (FORMAT_VERSION, digest):
+        write_catalog_file(path, Catalog.from_json(raw), digest)
+        # Files of older formats are dropped, and the new file counts towards the cache size limit
+        for name in os.listdir(cache_dir):
+            match = _CACHE_FILE_RE.match(name)
+            if match and match.group("compiled") == rel_years and name != os.path.basename(path):
+                try:
+                    os.remove(os.path.join(cache_dir, name))
+                except OSError:
+                    pass
+        _evict(cache_dir, kwargs.get("max_bytes") or CACHE_MAX_BYTES, keep = rel_years)
+    del raw
+
+    return MappedCatalog(path)
+
+
+def academic_years(current_year, current_mth_day):
+    """AYs offered in the app (e.g. "2018-2019"), up to the current one which starts on 6 August."""
+    if current_mth_day < "08-06":
+        return [f"{yr-1}-{yr}" for yr in range(2019, current_year+1)]
+
+    return [f"{yr}-{yr+1}" for yr in range(2018, current_year+1)]
+
+
+class CatalogPrefetcher:
+    """Loads and indexes the catalogs of several AYs concurrently in a bounded thread pool.
+
+    Requests for an AY that is still loading wait on the in-flight download instead of starting another,
+    and AYs outside the warm-up list are loaded on demand through the same pool.
+    """
+
+    def __init__(self, years, max_workers = 4, loader = load_catalog):
+        self.loader = loader
+        self._executor = ThreadPoolExecutor(max_workers = max_workers, thread_name_prefix = "catalog-prefetch")
+        self._lock = threading.Lock()
+        self._futures = {}
+        for rel_years in years:
+            self._submit(rel_years)
+
+    def _load(self, rel_years):
+        catalog = self.loader(rel_years)
+        # Indexes used by the course pickers are built here rather than on the first user request
+        catalog.search_index
+        catalog.with_credits().search_index
+        return catalog
+
+    def _submit(self, rel_years):
+        future = self._executor.submit(self._load, rel_years)
+        self._futures[rel_years] = future
+        return future
+
+    def get(self, rel_years, timeout = None):
+        with self._lock:
+            future = self._futures.get(rel_years)
+            # Failed loads are retried on the next request
+            if future is None or (future.done() and future.exception() is not None):
+                future = self._submit(rel_years)
+
+        return future.result(timeout = timeout)
+
+    def ready(self, rel_years):
+        future = self._futures.get(rel_years)
+        return future is not None and future.done() and future.exception() is None
+
+    def progress(self):
+        """(number of AYs loaded, number of AYs requested, {AY: error message} for failed loads)"""
+        futures = dict(self._futures)
+        done = [ay for ay, future in futures.items() if future.done()]
+        errors = {ay: str(futures[ay].exception()) for ay in done if futures[ay].exception() is not None}
+
+        return len(done) - len(errors), len(futures), errors
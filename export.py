@@ -0,0 +1,162 @@
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+from gpa import GRADES
+from tracker import row_hashes
+
+
+# Trackers with at least this many rows are written in XlsxWriter's constant memory mode
+CONSTANT_MEMORY_ROWS = 5000
+
+
+class ExportCache:
+    """Thread-safe LRU cache of generated files, bounded by the total size of the cached bytes."""
+
+    def __init__(self, max_bytes = 64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            data = self._items.get(key)
+            if data is not None:
+                self._items.move_to_end(key)
+            return data
+
+    def put(self, key, data):
+        if len(data) > self.max_bytes:
+            return data
+
+        with self._lock:
+            if key in self._items:
+                self.nbytes -= len(self._items.pop(key))
+            self._items[key] = data
+            self.nbytes += len(data)
+            while self.nbytes > self.max_bytes:
+                _, evicted = self._items.popitem(last = False)
+                self.nbytes -= len(evicted)
+
+        return data
+
+    def get_or_create(self, key, create):
+        data = self.get(key)
+        return data if data is not None else self.put(key, create())
+
+
+def content_key(df):
+    """Key of the tracker's contents, derived from its row content hashes. Exports of each format are
+    cached under it with the format as a prefix (e.g. "xlsx:<key>"), so the rows are hashed once for all of them.
+    """
+    return hashlib.sha256(row_hashes(df).tobytes()).hexdigest()
+
+
+def _cell(value):
+    # Missing values are written as blank cells
+    return None if value is None or pd.isna(value) else value
+
+
+def to_excel(df, constant_memory = None):
+    """Writes the Course Tracker to an .xlsx workbook row by row, so XlsxWriter's constant memory mode
+    can be used for large trackers.
+    in:  dataframe
+    out: xlsx bytes
+    """
+    import xlsxwriter
+
+    if constant_memory is None:
+        constant_memory = len(df) >= CONSTANT_MEMORY_ROWS
+
+    output = io.BytesIO()
+    workbook = xlsxwriter.Workbook(output, {"in_memory": not constant_memory, "constant_memory": constant_memory})
+    worksheet = workbook.add_worksheet("course_tracker")
+
+    # Add formats and templates here
+    font_color = "#000000"
+    header_color = "#ffff00"
+
+    string_template = workbook.add_format({"font_color": font_color})
+    grade_template = workbook.add_format({"font_color": font_color, "align": "center", "bold": True})
+    ay_template = workbook.add_format({"font_color": font_color, "align": "right"})
+    float_template = workbook.add_format({"num_format": "0.0", "font_color": font_color})
+    header_template = workbook.add_format({"bg_color": header_color, "border": 1})
+    header_cell_template = workbook.add_format({"bold": True, "border": 1, "align": "center", "valign": "top"})
+
+    column_formats = {
+        "A": [string_template, 15],
+        "B": [string_template, 50],
+        "C": [float_template, 15],
+        "D": [grade_template, 15],
+        "E": [float_template, 15],
+        "F": [ay_template, 15]
+    }
+
+    for column in column_formats.keys():
+        worksheet.set_column(f"{column}:{column}", column_formats[column][1], column_formats[column][0])
+        worksheet.conditional_format(f"{column}1:{column}1", {"type": "no_errors", "format": header_template})
+
+    # Rows must be written in order for constant memory mode
+    worksheet.write_row(0, 0, list(df.columns), header_cell_template)
+    for i, row in enumerate(df.astype(object).itertuples(index = False, name = None), start = 1):
+        worksheet.write_row(i, 0, [_cell(value) for value in row])
+
+    # Automatically apply Filter function on shape of dataframe
+    worksheet.autofilter(0, 0, df.shape[0], df.shape[1]-1)
+
+    workbook.close()
+
+    return output.getvalue()
+
+
+def _text_array(pa, series):
+    # String column, with anything which is not already a string (e.g. numeric course codes) converted
+    values = series.astype(object).where(series.notna(), None)
+    try:
+        return pa.array(values, type = pa.string(), from_pandas = True)
+    except (pa.ArrowTypeError, pa.ArrowInvalid):
+        return pa.array([None if v is None else str(v) for v in values], type = pa.string())
+
+
+def _categorical(series, categories = None):
+    # Categorical with string categories, keeping any values outside `categories` as extra categories
+    if isinstance(series.dtype, pd.CategoricalDtype) and (categories is None or list(series.cat.categories) == categories):
+        values = series
+    else:
+        values = series.astype(object).where(series.notna(), None)
+        known = set(categories or [])
+        extra = [v for v in pd.unique(values) if v is not None and v not in known]
+        values = pd.Series(pd.Categorical(values, categories = (categories or []) + extra), index = series.index)
+
+    if any(not isinstance(c, str) for c in values.cat.categories):
+        values = values.cat.rename_categories([str(c) for c in values.cat.categories])
+
+    return values.array
+
+
+def to_parquet(df, compression = "zstd"):
+    """Writes the Course Tracker as a Parquet file with the expected_headers schema. "Grade" and "AY Taken" are
+    dictionary-encoded, so they are read back as Categoricals without parsing a value per row.
+    in:  dataframe
+    out: parquet bytes
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    table = pa.table({
+        "Course Code": _text_array(pa, df["Course Code"]),
+        "Course Title": _text_array(pa, df["Course Title"]),
+        "No. of CUs": pa.array(pd.to_numeric(df["No. of CUs"], errors = "coerce"), type = pa.float64(), from_pandas = True),
+        "Grade": pa.array(_categorical(df["Grade"], GRADES), type = pa.dictionary(pa.int8(), pa.string())),
+        "Grade Points": pa.array(pd.to_numeric(df["Grade Points"], errors = "coerce"), type = pa.float64(), from_pandas = True),
+        "AY Taken": pa.array(_categorical(df["AY Taken"]), type = pa.dictionary(pa.int16(), pa.string()))
+    })
+
+    output = io.BytesIO()
+    pq.write_table(table, output, compression = compression)
+
+    return output.getvalue()
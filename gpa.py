@@ -0,0 +1,182 @@
+import math
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+
+GRADES_TO_GPA = {"A+": 5.0,
+                 "A": 5.0,
+                 "A-": 4.5,
+                 "B+": 4.0,
+                 "B": 3.5,
+                 "B-": 3.0,
+                 "C+": 2.5,
+                 "C": 2.0,
+                 "D+": 1.5,
+                 "D": 1.0,
+                 "F": 0.0,
+                 "S": None,
+                 "U": None,
+                 "CS": None,
+                 "CU": None,
+                 "OVS": None,
+                 "OVU": None,
+                 "OVI": None,
+                 "EXE": None,
+                 "IC": None,
+                 "IP": None,
+                 "W": None}
+
+GRADES = list(GRADES_TO_GPA.keys())
+
+EXPECTED_HEADERS = ["Course Code", "Course Title", "No. of CUs", "Grade", "Grade Points", "AY Taken"]
+
+# Lower GPA bound (at 3 d.p.) for each degree classification, highest first
+DEGREE_CLASSES = {"Honours (Highest Distinction)": 4.50,
+                  "Honours (Distinction)": 4.00,
+                  "Honours (Merit)": 3.50,
+                  "Honours": 3.00,
+                  "Pass": 2.00}
+
+# Per-grade lookup vectors indexed by integer grade code (position in GRADES)
+GRADE_POINTS = np.array([np.nan if gp is None else gp for gp in GRADES_TO_GPA.values()])
+IN_GPA = ~np.isnan(GRADE_POINTS)
+NOT_COMPLETED = np.isin(GRADES, ["U", "CU", "OVU", "OVI", "IC", "IP", "W"])
+SU = np.isin(GRADES, ["S", "U"])
+CSCU = np.isin(GRADES, ["CS", "CU", "OVS", "OVU"])
+OTHER = np.isin(GRADES, ["EXE", "IC", "OVI", "IP", "W"])
+
+
+def degree_classification(gpa):
+    dp3_gpa = round(gpa, 3)
+    for degree_class, threshold in DEGREE_CLASSES.items():
+        if dp3_gpa >= threshold:
+            return degree_class
+
+    return "Below Graduation Threshold"
+
+
+class GPASummary(NamedTuple):
+    gpa: float
+    degree_class: str
+    gpa_cus: float
+    completed_cus: float
+    total_courses: int
+    gpa_courses: int
+    su_courses: int
+    cscu_courses: int
+    other_courses: int
+
+    def table_dict(self):
+        # Rows of the "Course and GPA Summary Metrics" table, in display order
+        return {
+            "Final GPA": round(self.gpa, 3),
+            "Degree Classification": self.degree_class,
+            "Your GPA (To 4 d.p.)": round(self.gpa, 4),
+            "No. of CUs used to calculate GPA": self.gpa_cus,
+            "Total No. of CUs completed successfully": self.completed_cus,
+            "Total No. of courses attempted (A + B + C + D)": self.total_courses,
+            "No. of courses accounted for in GPA (A)": self.gpa_courses,
+            "No. of courses which were S/Ued (B)": self.su_courses,
+            "No. of CS/CU/OVS/OVU courses taken (C)": self.cscu_courses,
+            "No. of courses with a 'EXE', 'IC', 'OVI', 'IP' or 'W' grade (D)": self.other_courses
+        }
+
+
+def grade_codes(grades):
+    """Maps letter grades to integer codes (position in GRADES), with -1 for unknown or missing grades."""
+    if isinstance(grades, pd.Series) and isinstance(grades.dtype, pd.CategoricalDtype) and list(grades.cat.categories) == GRADES:
+        return grades.cat.codes.to_numpy()
+
+    return pd.Categorical(grades, categories = GRADES).codes
+
+
+def summary_from_totals(cus_per_grade, count_per_grade, total_cus, total_courses):
+    """Builds the GPA summary from per-grade CU totals and course counts (indexed by grade code)."""
+    gpa_cus = float(cus_per_grade[IN_GPA].sum())
+    gpa = float(cus_per_grade[IN_GPA] @ GRADE_POINTS[IN_GPA]) / gpa_cus if gpa_cus else math.nan
+
+    return GPASummary(
+        gpa = gpa,
+        degree_class = degree_classification(gpa),
+        gpa_cus = gpa_cus,
+        completed_cus = float(total_cus - cus_per_grade[NOT_COMPLETED].sum()),
+        total_courses = int(total_courses),
+        gpa_courses = int(count_per_grade[IN_GPA].sum()),
+        su_courses = int(count_per_grade[SU].sum()),
+        cscu_courses = int(count_per_grade[CSCU].sum()),
+        other_courses = int(count_per_grade[OTHER].sum())
+    )
+
+
+def summarize_codes(codes, cus):
+    # One grouped pass: CU totals and course counts per grade code, every metric is derived from those
+    codes = np.asarray(codes, dtype = np.int64)
+    cus = np.nan_to_num(np.asarray(cus, dtype = np.float64))
+    known = codes >= 0
+
+    cus_per_grade = np.bincount(codes[known], weights = cus[known], minlength = len(GRADES))
+    count_per_grade = np.bincount(codes[known], minlength = len(GRADES))
+
+    return summary_from_totals(cus_per_grade, count_per_grade, cus.sum(), len(codes))
+
+
+def summarize(records):
+    """Computes the GPA summary of a Course Tracker.
+    in:  DataFrame with the expected_headers columns, or a list of rows in that order
+    out: GPASummary
+    """
+    if isinstance(records, pd.DataFrame):
+        return summarize_codes(grade_codes(records["Grade"]), records["No. of CUs"].to_numpy(dtype = np.float64, na_value = np.nan))
+
+    grades = [row[3] for row in records]
+    cus = [row[2] for row in records]
+
+    return summarize_codes(grade_codes(grades), np.array(cus, dtype = np.float64))
+
+
+# Function to calculate the new GPA if all new courses get the same grade
+def calculate_new_gpa_same_grade(grade_point, current_gpa, current_cus, new_cus):
+    total_grade_points = current_gpa * current_cus + grade_point * new_cus
+    return round(total_grade_points / (current_cus + new_cus), 4) if (current_cus + new_cus) > 0 else 0
+
+
+# Function to calculate the minimum weighted average GPA for new courses for a target GPA
+def req_weighted_grade_points(target_gpa, current_gpa, current_cus, new_cus):
+    new_grade_points_req = target_gpa * (current_cus + new_cus) - current_gpa * current_cus
+    new_courses_only_gpa = new_grade_points_req / new_cus
+    if new_courses_only_gpa <= 5.0 and new_courses_only_gpa >= 0.0:
+        return round(new_courses_only_gpa, 4)
+    else:
+        return "Impossible"
+
+
+# Function to determine the average letter grades required from the new weighted average GPA
+def points_to_grade_range(req_gpa):
+    # Define letter grade to point grade mapping
+    grade_gpa_dict = {5.0: "A+/A", 4.5: "A-", 4.0: "B+", 3.5: "B", 3.0: "B-", 2.5: "C+", 2.0: "C", 1.5: "D+", 1.0: "D", 0.0: "F"}
+    if req_gpa in grade_gpa_dict.keys():
+        return f"exactly {grade_gpa_dict[req_gpa]}"
+    else:
+        sorted_points = sorted(grade_gpa_dict.keys(), reverse=True)
+
+        for i in range(len(sorted_points) - 1):
+            upper = sorted_points[i]
+            lower = sorted_points[i + 1]
+            if lower < req_gpa < upper:
+                letter1 = grade_gpa_dict[lower]
+                letter2 = grade_gpa_dict[upper]
+                if abs(req_gpa - lower) == abs(req_gpa - upper):
+                    return f"exactly between {letter1} and {letter2}"
+                else:
+                    closest_letter = letter1 if abs(req_gpa - lower) < abs(req_gpa - upper) else letter2
+                    return f"between {letter1} and {letter2}, closer to {closest_letter}"
+
+        if req_gpa >= max(sorted_points):
+            return f"at least {grade_gpa_dict[max(sorted_points)]}"
+        elif req_gpa <= min(sorted_points):
+            return f"at most {grade_gpa_dict[min(sorted_points)]}"
+
+        # Exact match fallback
+        return f"exactly {grade_gpa_dict.get(req_gpa, 'Unknown')}"
@@ -0,0 +1,39 @@
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+DEFAULT_TIMEOUT = (5, 30)
+
+_session = None
+_lock = threading.Lock()
+
+
+class _TimeoutHTTPAdapter(HTTPAdapter):
+    # Applies a default timeout to every request that does not set its own
+    def send(self, request, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = DEFAULT_TIMEOUT
+        return super().send(request, **kwargs)
+
+
+def get_session():
+    """Returns the process-wide keep-alive session used for all outbound requests
+    (pooled connections, retries with backoff, gzip and a default timeout).
+    """
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                retries = Retry(total = 3, backoff_factor = 0.5, status_forcelist = [429, 500, 502, 503, 504], allowed_methods = ["GET", "HEAD"])
+                adapter = _TimeoutHTTPAdapter(pool_connections = 4, pool_maxsize = 16, max_retries = retries)
+
+                session = requests.Session()
+                session.headers.update({"Accept-Encoding": "gzip", "User-Agent": "nus_gpa_insight"})
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+
+    return _session
@@ -0,0 +1,247 @@
+import cProfile
+import contextlib
+import io
+import json
+import logging
+import os
+import pstats
+import tempfile
+import threading
+import time
+import tracemalloc
+from typing import NamedTuple
+
+
+logger = logging.getLogger(__name__)
+
+# Debug panel, allocation tracking and Prometheus text export settings (can be set through environment variables)
+DEBUG = os.environ.get("NUS_GPA_DEBUG", "") == "1"
+TRACE_ALLOCATIONS = os.environ.get("NUS_GPA_TRACE_ALLOC", "") == "1"
+METRICS_FILE = os.environ.get("NUS_GPA_METRICS_FILE")
+
+# Upper bounds (seconds) of the phase duration histogram buckets
+LATENCY_BUCKETS = [0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0]
+
+
+class Phase(NamedTuple):
+    name: str
+    seconds: float
+    alloc_bytes: int
+    peak_bytes: int
+
+
+class Rerun:
+    """Named phases of one script or fragment run. Allocation figures are only filled in while tracemalloc
+    is tracing: alloc_bytes is the memory still held at the end of the phase, peak_bytes the highest
+    extra memory during it.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.started_at = time.time()
+        self.seconds = None
+        self.phases = []
+        self.profile = None
+        self._start = time.perf_counter()
+        self._path = []
+        self._peaks = []
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            current, peak = tracemalloc.get_traced_memory()
+            self._peaks.append(peak)
+            tracemalloc.reset_peak()
+        self._path.append(name)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            path = ".".join(self._path)
+            self._path.pop()
+
+            alloc_bytes = peak_bytes = 0
+            if tracing and tracemalloc.is_tracing():
+                end, peak = tracemalloc.get_traced_memory()
+                # Nested phases reset the peak, so the highest peak seen inside is carried up
+                peak = max(peak, self._peaks.pop())
+                alloc_bytes, peak_bytes = end - current, max(peak - current, 0)
+                if self._peaks:
+                    self._peaks[-1] = max(self._peaks[-1], peak)
+
+            self.phases.append(Phase(path, seconds, alloc_bytes, peak_bytes))
+
+    def finish(self):
+        self.seconds = time.perf_counter() - self._start
+        return self
+
+    def totals(self):
+        """{phase: [seconds, alloc bytes, peak bytes, calls]} with repeated phases added up, in first-seen order"""
+        totals = {}
+        for phase in self.phases:
+            total = totals.setdefault(phase.name, [0.0, 0, 0, 0])
+            total[0] += phase.seconds
+            total[1] += phase.alloc_bytes
+            total[2] = max(total[2], phase.peak_bytes)
+            total[3] += 1
+        return totals
+
+    def to_dict(self):
+        return {"rerun": self.name,
+                "started_at": round(self.started_at, 3),
+                "ms": round(self.seconds * 1000, 3),
+                "phases": [{"phase": name, "ms": round(seconds * 1000, 3), "alloc_bytes": alloc, "peak_bytes": peak, "calls": calls}
+                           for name, (seconds, alloc, peak, calls) in self.totals().items()]}
+
+
+def _label_text(labels):
+    return ",".join(f'{k}="{v}"' for k, v in labels)
+
+
+class Metrics:
+    """Process-wide totals and duration histograms of every rerun and phase, for Prometheus text export."""
+
+    def __init__(self, buckets = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def _observe(self, metric, labels, seconds, alloc_bytes):
+        series = self._series.setdefault((metric, labels), {"count": 0, "seconds": 0.0, "alloc_bytes": 0, "buckets": [0] * len(self.buckets)})
+        series["count"] += 1
+        series["seconds"] += seconds
+        series["alloc_bytes"] += alloc_bytes
+        for i, bound in enumerate(self.buckets):
+            if seconds <= bound:
+                series["buckets"][i] += 1
+
+    def observe(self, rerun):
+        with self._lock:
+            self._observe("rerun", (("rerun", rerun.name),), rerun.seconds, 0)
+            for name, (seconds, alloc, _, _) in rerun.totals().items():
+                self._observe("phase", (("rerun", rerun.name), ("phase", name)), seconds, alloc)
+
+    def prometheus_text(self):
+        with self._lock:
+            series = sorted(self._series.items())
+
+        lines = []
+        for metric in ("rerun", "phase"):
+            name = f"nus_gpa_{metric}_seconds"
+            lines += [f"# HELP {name} Wall time per {metric}.", f"# TYPE {name} histogram"]
+            for (m, labels), values in series:
+                if m != metric:
+                    continue
+                label_text = _label_text(labels)
+                for bound, count in zip(self.buckets, values["buckets"]):
+                    lines.append(f'{name}_bucket{{{label_text},le="{bound}"}} {count}')
+                lines.append(f'{name}_bucket{{{label_text},le="+Inf"}} {values["count"]}')
+                lines.append(f"{name}_sum{{{label_text}}} {values['seconds']:.6f}")
+                lines.append(f"{name}_count{{{label_text}}} {values['count']}")
+
+        name = "nus_gpa_phase_alloc_bytes_total"
+        lines += [f"# HELP {name} Memory still held at the end of each phase (while allocation tracking is on).", f"# TYPE {name} counter"]
+        for (m, labels), values in series:
+            if m == "phase":
+                lines.append(f"{name}{{{_label_text(labels)}}} {values['alloc_bytes']}")
+
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        # Written to a temporary file first so a scraper never reads a partial file
+        fd, tmp_path = tempfile.mkstemp(dir = os.path.dirname(os.path.abspath(path)), suffix = ".tmp")
+        with os.fdopen(fd, "w") as f:
+            f.write(self.prometheus_text())
+        os.replace(tmp_path, path)
+
+
+METRICS = Metrics()
+
+# Each Streamlit session runs its script on its own thread
+_local = threading.local()
+
+
+def current_rerun():
+    return getattr(_local, "rerun", None)
+
+
+def set_allocation_tracking(enabled):
+    if enabled and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    elif not enabled and tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+@contextlib.contextmanager
+def phase(name):
+    """Records a named phase of the current rerun (does nothing outside a rerun)."""
+    rerun = current_rerun()
+    if rerun is None:
+        yield
+        return
+    with rerun.phase(name):
+        yield
+
+
+@contextlib.contextmanager
+def rerun(name, history = None, profile = False):
+    """Records a script or fragment run. Inside another run (e.g. a fragment called during a full rerun)
+    it is recorded as a phase of that run instead.
+    Finished runs are appended to history, logged as JSON, added to METRICS and, if METRICS_FILE is set,
+    exported in the Prometheus text format. With profile, the run is captured with cProfile.
+    """
+    if current_rerun() is not None:
+        with phase(name):
+            yield current_rerun()
+        return
+
+    run = _local.rerun = Rerun(name)
+    profiler = cProfile.Profile() if profile else None
+    try:
+        if profiler is not None:
+            try:
+                profiler.enable()
+            except ValueError:
+                # Only one profiler can run at a time per process
+                logger.warning("Another rerun is already being profiled")
+                profiler = None
+        yield run
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            run.profile = profiler
+        _local.rerun = None
+        run.finish()
+
+        METRICS.observe(run)
+        if history is not None:
+            history.append(run)
+        logger.info(json.dumps(run.to_dict()))
+        if METRICS_FILE:
+            try:
+                METRICS.write(METRICS_FILE)
+            except OSError:
+                logger.exception("Could not write metrics to %s", METRICS_FILE)
+
+
+def profile_report(profiler, limit = 25, sort = "cumulative"):
+    """Text report of the slowest calls of a cProfile capture, and the raw stats file (for snakeviz etc.)."""
+    out = io.StringIO()
+    pstats.Stats(profiler, stream = out).sort_stats(sort).print_stats(limit)
+
+    fd, path = tempfile.mkstemp(suffix = ".prof")
+    os.close(fd)
+    try:
+        profiler.dump_stats(path)
+        with open(path, "rb") as f:
+            raw = f.read()
+    finally:
+        os.remove(path)
+
+    return out.getvalue(), raw
+
+
+if TRACE_ALLOCATIONS:
+    set_allocation_tracking(True)
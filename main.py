@@ -1,38 +1,105 @@
 import streamlit as st
-import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-import altair as alt
-import plotly.graph_objects as go
-import plotly.io as pio
-
-import xlsxwriter
-import base64
-import io
-import requests
+
+import collections
 import datetime
+import functools
+import json
+import tracemalloc
 
-from PIL import Image
 from streamlit_extras.badges import badge
 
+from assets import load_image
+from catalog import CatalogPrefetcher, academic_years, load_mapped_catalog
+from export import ExportCache, content_key, to_excel, to_parquet
+from instrumentation import DEBUG, METRICS, current_rerun, phase, profile_report, rerun, set_allocation_tracking
+from gpa import DEGREE_CLASSES, GRADES_TO_GPA, calculate_new_gpa_same_grade, points_to_grade_range, req_weighted_grade_points
+from report import ROW_FILL_COLORS, ROW_FONT_COLORS, summary_key, summary_pdf
+from scenarios import grade_scenarios
+from su_option import DEFAULT_SU_BUDGET, optimize_su
+from tracker import TrackerStore, ingest_upload
+
 
 @st.cache_resource
+def get_catalog_prefetcher():
+    # Started once per server process: every AY catalog is downloaded and indexed in the background.
+    # Catalogs are compiled once and memory-mapped, so all server processes on a host share them
+    now = datetime.datetime.now()
+    return CatalogPrefetcher(academic_years(now.year, now.strftime("%m-%d")), max_workers = 4, loader = load_mapped_catalog)
+
+
 def get_initial_data(rel_years):
-    # Obtaining up-to-date data for application
-    api_url = f"https://api.nusmods.com/v2/{rel_years}/moduleInfo.json"
-    data = requests.get(api_url).json()
+    # Obtaining up-to-date data for application (backed by a persistent on-disk cache),
+    # keeping only the course code, title and CUs of each course
+    data = get_catalog_prefetcher().get(rel_years)
     
     return data
 
 
+@st.cache_resource
+def get_export_cache():
+    # Generated downloads shared by all sessions in this process, keyed by content
+    return ExportCache(max_bytes = 64 * 1024 * 1024)
+
+
+def rerun_history():
+    # Recent runs of this session, shown in the debug panel
+    if "rerun_history" not in st.session_state:
+        st.session_state["rerun_history"] = collections.deque(maxlen = 20)
+    return st.session_state["rerun_history"]
+
+
+def instrumented(name):
+    # Full reruns and fragment reruns are each recorded with their phases, nested calls as phases of the enclosing run
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            profile = current_rerun() is None and st.session_state.pop("profile_next_rerun", False)
+            with rerun(name, history = rerun_history(), profile = profile):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def debug_panel():
+    # Opt-in with NUS_GPA_DEBUG=1 only: the allocation toggle and the profiler act on the whole server process,
+    # so a query parameter any visitor can set must not reach them
+    with st.sidebar.expander("🐞 Debug: rerun timings"):
+        tracking = st.checkbox("Track allocations (tracemalloc)", value = tracemalloc.is_tracing())
+        set_allocation_tracking(tracking)
+
+        history = rerun_history()
+        if history:
+            last = history[-1]
+            st.caption(f"Last run ({last.name}): {last.seconds * 1000:.1f} ms")
+            st.dataframe(pd.DataFrame([{"Phase": name, "ms": seconds * 1000, "Alloc KB": alloc / 1024, "Peak KB": peak / 1024, "Calls": calls}
+                                       for name, (seconds, alloc, peak, calls) in last.totals().items()]).style.format(precision = 1),
+                         hide_index = True, use_container_width = True)
+            st.caption("Recent runs")
+            st.dataframe(pd.DataFrame([{"Run": run.name, "ms": run.seconds * 1000} for run in reversed(history)]).style.format(precision = 1),
+                         hide_index = True, use_container_width = True)
+
+        st.download_button("Metrics (Prometheus text)", data = METRICS.prometheus_text(), file_name = "nus_gpa_metrics.prom", mime = "text/plain")
+        st.download_button("Run log (JSON lines)", data = "\n".join(json.dumps(run.to_dict()) for run in history), file_name = "reruns.jsonl", mime = "application/json")
+
+        # The callback runs before the rerun triggered by the click, so that rerun is the one profiled
+        st.button("Profile a rerun (cProfile)", on_click = lambda: st.session_state.update(profile_next_rerun = True))
+
+        profiled = next((run for run in reversed(history) if run.profile is not None), None)
+        if profiled is not None:
+            report, raw = profile_report(profiled.profile)
+            st.code(report)
+            st.download_button("Download profile (.prof)", data = raw, file_name = "rerun.prof", mime = "application/octet-stream")
+
+
+@instrumented("main")
 def main():
+    prefetcher = get_catalog_prefetcher()
+
     col1, col2, col3 = st.columns([0.034, 0.265, 0.035])
     
-    with col1:
-        url = "https://github.com/tsu2000/nus_gpa_insight/raw/main/images/nus.png"
-        response = requests.get(url)
-        img = Image.open(io.BytesIO(response.content))
-        st.image(img, output_format = "png")
+    with col1, phase("images"):
+        st.image(load_image("nus.png"), output_format = "png")
 
     with col2:
         st.title("&nbsp; NUS GPA Insight")
@@ -54,17 +121,20 @@ def main():
         st.write("##")
         st.write("##")
 
+        loaded, requested, errors = prefetcher.progress()
+        if loaded < requested:
+            st.caption(f"⏳ Course data loaded for {loaded}/{requested} AYs")
+        for ay in errors:
+            st.caption(f"⚠️ Could not load course data for AY {ay.replace('-', '/')}")
+
         st.markdown("---")     
 
         col_a, col_b = st.columns([1.3, 0.9])
 
         with col_a:
             st.markdown("Data provided by:")
-        with col_b:
-            url2 = "https://github.com/tsu2000/nus_gpa_insight/raw/main/images/nusmods_banner.png"
-            response = requests.get(url2)
-            img = Image.open(io.BytesIO(response.content))
-            st.image(img, use_container_width = True, output_format = "png")
+        with col_b, phase("images"):
+            st.image(load_image("nusmods_banner.png"), use_container_width = True, output_format = "png")
 
     # Obtain relevant years for courses
     now = datetime.datetime.now()
@@ -83,63 +153,64 @@ def main():
         explain()
     
     
+@instrumented("calc")
 def calc(current_year, current_mth_day):
     st.markdown("#### 📝 &nbsp; Current Course Tracker")
 
     st.markdown("You can add NUS courses to the Course Tracker which can be downloaded to an `.xlsx` file for personal use. You can also view and download statistics about your current GPA based on the added course data from the Course Tracker as a `.pdf` file. _**(Course Info Source: [NUSMods API](https://api.nusmods.com/v2/))**_")
 
-    if current_mth_day < "08-06":
-        options = [f"AY {yr-1}/{yr}" for yr in np.arange(2019, current_year+1)]
+    options = [f"AY {ay.replace('-', '/')}" for ay in academic_years(current_year, current_mth_day)]
 
-    elif current_mth_day >= "08-06":
-        options = [f"AY {yr}/{yr+1}" for yr in np.arange(2018, current_year+1)]
+    if "tracker" not in st.session_state:
+        st.session_state["tracker"] = TrackerStore()
 
-    if "all_course_data" not in st.session_state:
-        st.session_state["all_course_data"] = []
-
-    if "upload_status" not in st.session_state:
-        st.session_state["upload_status"] = False
+    if "ingested_upload" not in st.session_state:
+        st.session_state["ingested_upload"] = None
 
     opt = st.selectbox("Select an Academic Year (AY) to obtain full list of courses available for the time period:", options, index = len(options)-1)
 
     year_1, year_2 = opt[3:7], opt[8:]
     mod_years = f"{year_1}-{year_2}"
 
-    data = get_initial_data(mod_years)
-
-    grades_to_gpa = {"A+": 5.0,
-                     "A": 5.0,
-                     "A-": 4.5, 
-                     "B+": 4.0, 
-                     "B": 3.5, 
-                     "B-": 3.0, 
-                     "C+": 2.5, 
-                     "C": 2.0, 
-                     "D+": 1.5, 
-                     "D": 1.0, 
-                     "F": 0.0, 
-                     "S": None, 
-                     "U": None,
-                     "CS": None,
-                     "CU": None,
-                     "OVS": None,
-                     "OVU": None,
-                     "OVI": None,
-                     "EXE": None,
-                     "IC": None,
-                     "IP": None,
-                     "W": None}
-
-    cu_dict = {course["moduleCode"]: [course["title"], float(course["moduleCredit"])] for course in data}
-
-    selected_mod = st.selectbox(f"Select a course from AY {year_1}/{year_2} which you have taken from the list (can type to search):", 
-                                cu_dict,
-                                format_func = lambda key: key + f" - {str(cu_dict[key][0])} [{str(cu_dict[key][1])} CUs]")
+    with phase("get_initial_data"):
+        data = get_initial_data(mod_years)
 
-    selected_grade = st.selectbox("Select grade you have obtained for the respective course:", grades_to_gpa)
+    grades_to_gpa = GRADES_TO_GPA
+
+    cu_dict = data
 
     final_mod_years = mod_years[:4] + "/" + mod_years[5:]
 
+    all_AY = [yr[3:] for yr in options]
+
+    # Course editing, table and analysis rerun as fragments, so an edit does not re-execute the whole app
+    course_tracker(cu_dict, grades_to_gpa, final_mod_years, all_AY)
+
+    st.markdown("---")
+
+
+def preview(items, limit = 10):
+    # Comma-separated list which is cut short for long uploads
+    text = ", ".join(items[:limit])
+    return text + f" and {len(items) - limit} more" if len(items) > limit else text
+
+
+@st.fragment
+@instrumented("course_tracker")
+def course_tracker(cu_dict, grades_to_gpa, final_mod_years, all_AY):
+    tracker = st.session_state["tracker"]
+    search_index = cu_dict.search_index
+
+    # Only the top matches from the prebuilt search index are sent to the selectbox
+    mod_query = st.text_input(f"Search for a course from AY {final_mod_years} which you have taken (by course code or title):")
+
+    with phase("course_search"):
+        selected_mod = st.selectbox("Select the course from the matching results:", 
+                                    search_index.search(mod_query),
+                                    format_func = search_index.label)
+
+    selected_grade = st.selectbox("Select grade you have obtained for the respective course:", grades_to_gpa)
+
     def results(mod_code, grade):
         mod_title = cu_dict[mod_code][0]
         selected_cus = cu_dict[mod_code][1]
@@ -151,243 +222,189 @@ def calc(current_year, current_mth_day):
 
     with amb_col:
         amb = st.button("Add Course")
-        if amb:
-            st.session_state.all_course_data.append(results(selected_mod, selected_grade) + [final_mod_years])
+        if amb and selected_mod is not None:
+            tracker.add(results(selected_mod, selected_grade) + [final_mod_years])
 
     with rmb_col:
         rmb = st.button("Remove last row")
-        if rmb and st.session_state["all_course_data"] != []:
-            st.session_state.all_course_data.remove(st.session_state.all_course_data[-1])
+        if rmb and len(tracker) > 0:
+            tracker.pop()
 
     with clear_col:
         clear = st.button("Clear All")
         if clear:
-            st.session_state["all_course_data"] = []
+            tracker.clear()
 
     # Functionality to add mdoules to existing spreadsheet
-    upload_xlsx = st.file_uploader("Or, upload an pre-existing `.xlsx` file with course details in the same format:", type = "xlsx", accept_multiple_files = False)
-
-    expected_headers = ["Course Code", "Course Title", "No. of CUs", "Grade", "Grade Points", "AY Taken"]
-
-    if upload_xlsx is not None and st.session_state["upload_status"] == False:
-        df_upload = pd.read_excel(upload_xlsx)
-        if list(df_upload.columns) != expected_headers:
-            st.error("Incorrect column headers. Please use the exact format: " + ", ".join(expected_headers), icon = "🚨")
+    upload_file = st.file_uploader("Or, upload a pre-existing `.xlsx` or `.parquet` file with course details in the same format:", type = ["xlsx", "parquet"], accept_multiple_files = False)
+
+    # Each uploaded file is ingested once, and rows already in the tracker are never inserted twice
+    if upload_file is not None and st.session_state["ingested_upload"] != upload_file.file_id:
+        try:
+            with phase("ingest_upload"):
+                ingested = ingest_upload(upload_file, cu_dict, tracker.to_frame())
+        except ValueError as e:
+            st.error(str(e), icon = "🚨")
             st.stop()
-        for row in range(len(df_upload)):
-            st.session_state.all_course_data.append([i for i in df_upload.iloc[row]])
-        st.session_state["upload_status"] = True
+        tracker.extend(ingested.rows.values.tolist())
+        st.session_state["ingested_upload"] = upload_file.file_id
 
-    elif upload_xlsx is None:
-        st.session_state["upload_status"] = False
+        if ingested.duplicates:
+            st.info(f"Skipped {ingested.duplicates} row(s) which are already in the Course Tracker.")
+        if ingested.unknown_codes:
+            st.warning(f"Courses not offered in AY {final_mod_years}: " + preview(ingested.unknown_codes), icon = "⚠️")
+        if ingested.cu_mismatches:
+            st.warning(f"CUs differ from AY {final_mod_years} course info for: " + preview([f"{code} ({cus} vs {catalog_cus} CUs)" for code, cus, catalog_cus in ingested.cu_mismatches]), icon = "⚠️")
 
-    df = pd.DataFrame(columns = expected_headers,
-                      data = st.session_state["all_course_data"])
-    
-    # Change column categories
-    df["Grade"] = df["Grade"].astype("category")
-    df["Grade"] = pd.Categorical(df["Grade"], categories = list(grades_to_gpa.keys()))
-
-    all_AY = [yr[3:] for yr in options]
+    elif upload_file is None:
+        st.session_state["ingested_upload"] = None
 
-    df["AY Taken"] = df["AY Taken"].astype("category")
-    df["AY Taken"] = pd.Categorical(df["AY Taken"], categories = all_AY)
+    # Typed DataFrame with "Grade" and "AY Taken" as categories, only rebuilt after an edit
+    with phase("to_frame"):
+        df = tracker.to_frame(all_AY)
 
     # Show up-to-date dataframe
     st.markdown("###### Add a course and grade to view and download the data table:")
 
     # Display course data in DataFrame
-    if st.session_state["all_course_data"] != []:
-        st.dataframe(df.style.format(precision = 1),
-                     hide_index = True,
-                     use_container_width = True)
+    if len(tracker) > 0:
+        if tracker.gpa_cus > 0:
+            st.markdown(f"Current GPA: **{round(tracker.gpa, 4)}** from {tracker.gpa_cus} CUs")
+
+        with phase("dataframe"):
+            st.dataframe(df.style.format(precision = 1),
+                         hide_index = True,
+                         use_container_width = True)
         
+    course_summary(df, tracker.summary(), tracker.trajectory)
+
+
+@st.fragment
+@instrumented("course_summary")
+def course_summary(df, summary, trajectory):
     analysis_col, export_col = st.columns([1, 0.265]) 
 
     with export_col:
-        def to_excel(df):
-            output = io.BytesIO()
-            writer = pd.ExcelWriter(output, engine = "xlsxwriter")
-
-            df.to_excel(writer, sheet_name = "course_tracker", index = False)
-            workbook = writer.book
-            worksheet = writer.sheets["course_tracker"]
-
-            # Add formats and templates here        
-            font_color = "#000000"
-            header_color = "#ffff00"
-
-            string_template = workbook.add_format(
-                {
-                    "font_color": font_color, 
-                }
-            )
-
-            grade_template = workbook.add_format(
-                {
-                    "font_color": font_color, 
-                    "align": "center",
-                    "bold": True
-                }
-            )
+        # Each file is only generated when requested, and cached by the tracker contents
+        if not df.empty:
+            export_cache = get_export_cache()
+            tracker_key = content_key(df)
+
+            for kind, export, mime in (("xlsx", to_excel, "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+                                       ("parquet", to_parquet, "application/vnd.apache.parquet")):
+                # The bytes are kept from get_or_create, as a file over the cache limit (or evicted by another
+                # session's export) would not be found in the cache again
+                key = f"{kind}:{tracker_key}"
+                data = export_cache.get(key)
+                if data is None and st.button(f":inbox_tray: Prepare (.{kind})"):
+                    with phase(export.__name__):
+                        data = export_cache.get_or_create(key, lambda: export(df))
+
+                if data is not None:
+                    st.download_button(f":inbox_tray: Download (.{kind})", data = data, file_name = f"course_details.{kind}", mime = mime)
 
-            ay_template = workbook.add_format(
-                {
-                    "font_color": font_color, 
-                    "align": "right"
-                }
-            )
+    with analysis_col:
+        if not df.empty:
+            analysis = st.button("View Analysis")
+        else:
+            analysis = None
 
-            float_template = workbook.add_format(
-                {
-                    "num_format": "0.0",
-                    "font_color": font_color, 
-                }
+    if analysis and not df.empty:
+        table_dict = summary.table_dict()
+        table_dict["Date of Overview"] = datetime.datetime.now().strftime("%d %b %Y")
+
+        # Plotly is only loaded once an analysis is requested
+        with phase("plotly_import"):
+            import plotly.graph_objects as go
+
+        col_fill_colors = ROW_FILL_COLORS
+        font_colors = ROW_FONT_COLORS
+
+        with phase("plotly"):
+            fig = go.Figure(
+                data = [
+                    go.Table(
+                        columnwidth = [2.5, 1.5],
+                        header = dict(
+                            values = ["<b>Course and GPA Summary Metrics<b>", "<b>Value<b>"],
+                            fill_color = "navy",
+                            line_color = "black",
+                            align = "center",
+                            font = dict(color = "white", size = 14, family = "Arial")
+                        ),
+                        cells = dict(
+                            values = [list(table_dict.keys()), list(table_dict.values())], 
+                            fill_color = [col_fill_colors, col_fill_colors],
+                            line_color = "black",
+                            align = ["right", "left"],
+                            font = dict(color = [font_colors, font_colors], size = [14, 14], family = "Arial"),
+                            height = 25
+                        )
+                    )
+                ]
             )
 
-            header_template = workbook.add_format(
-                {
-                    "bg_color": header_color, 
-                    "border": 1
-                }
-            )
+            fig.update_layout(height = 318, width = 700, margin = dict(l = 5, r = 5, t = 5, b = 5))
+            st.plotly_chart(fig, use_container_width = True)
 
-            column_formats = {
-                "A": [string_template, 15],
-                "B": [string_template, 50],
-                "C": [float_template, 15],
-                "D": [grade_template, 15],
-                "E": [float_template, 15],
-                "F": [ay_template, 15]
-            }
+        # Render the same table directly as a vector PDF (no headless browser), cached by the summary contents
+        with phase("summary_pdf"):
+            pdf_data = get_export_cache().get_or_create(summary_key(table_dict), lambda: summary_pdf(table_dict))
 
-            for column in column_formats.keys():
-                worksheet.set_column(f"{column}:{column}", column_formats[column][1], column_formats[column][0])
-                worksheet.conditional_format(f"{column}1:{column}1", {"type": "no_errors", "format": header_template})
+        st.download_button(
+            label = "Download as PDF",
+            data = pdf_data,
+            file_name = "gpa_overview.pdf",
+            mime = "application/octet-stream",
+            help = "Downloads all course details as a PDF File"
+        )
 
-            # Automatically apply Filter function on shape of dataframe
-            worksheet.autofilter(0, 0, df.shape[0], df.shape[1]-1)
+        # Term-by-term GPA, from the running per-AY totals kept by the tracker
+        with phase("trajectory"):
+            series = trajectory.frame()
 
-            # Saving and returning data
-            writer.close()
-            processed_data = output.getvalue()
+        if len(series) > 1:
+            st.markdown("###### GPA by Academic Year")
+            st.line_chart(series.set_index("Term")[["Term GPA", "Cumulative GPA"]])
 
-            return processed_data
+    if not df.empty:
+        su_planner(df)
 
-        def get_table_download_link(df):
-            """Generates a link allowing the data in a given Pandas DataFrame to be downloaded
-            in:  dataframe
-            out: href string
-            """
-            val = to_excel(df)
-            b64 = base64.b64encode(val)
 
-            return f'<a href="data:application/octet-stream;base64,{b64.decode()}" download="course_details.xlsx">:inbox_tray: Download (.xlsx)</a>' 
+@st.fragment
+@instrumented("su_planner")
+def su_planner(df):
+    with st.expander("🔀 S/U Option Planner"):
+        st.markdown("Find the courses to S/U which give you the highest GPA, or which reach an honours classification while using as few CUs of your S/U allowance as possible.")
 
-        if st.session_state["all_course_data"] != []:
-            st.markdown(get_table_download_link(df), unsafe_allow_html = True)
+        budget_col, goal_col = st.columns([1, 1.5])
 
-    with analysis_col:
-        if st.session_state["all_course_data"] != []:
-            analysis = st.button("View Analysis")
-        else:
-            analysis = None
+        with budget_col:
+            budget_cus = st.number_input("S/U allowance left (CUs):", min_value = 0.0, max_value = 200.0, value = DEFAULT_SU_BUDGET, step = 0.5, format = "%0.1f")
 
-    if analysis and st.session_state["all_course_data"] != []:
-
-        df2 = df.dropna()
-        gpa = sum(df2["No. of CUs"] * df2["Grade Points"]) / sum(df2["No. of CUs"])
-        total_cus_gpa = sum(df2["No. of CUs"])
-
-        dp3_gpa = round(gpa, 3)
-        dp4_gpa = round(gpa, 4)
-
-        # Degree classification
-        if dp3_gpa >= 4.50:
-            degree_class = "Honours (Highest Distinction)"
-        elif dp3_gpa >= 4.00:
-            degree_class = "Honours (Distinction)"
-        elif dp3_gpa >= 3.50:
-            degree_class = "Honours (Merit)"            
-        elif dp3_gpa >= 3.00:
-            degree_class = "Honours"        
-        elif dp3_gpa >= 2.00:
-            degree_class = "Pass"
-        else:
-            degree_class = "Below Graduation Threshold"
-
-        cus_not_counted = df.loc[(df["Grade"] == "U") | (df["Grade"] == "CU") | (df["Grade"] == "OVU") | (df["Grade"] == "OVI") | (df["Grade"] == "IC") | (df["Grade"] == "IP") | (df["Grade"] == "W")]
-
-        total_completed_cus = sum(df["No. of CUs"]) - sum(cus_not_counted["No. of CUs"])
-
-        # Cumulative courses
-        complete_total_mods = len(df)
-        conv_mods = len(df2)
-        sued_mods = len(df.loc[(df["Grade"] == "U") | (df["Grade"] == "S")])
-        cscu_mods = len(df.loc[(df["Grade"] == "CU") | (df["Grade"] == "CS") | (df["Grade"] == "OVU") | (df["Grade"] == "OVS")])
-        unrq_mods = len(df.loc[(df["Grade"] == "EXE") | (df["Grade"] == "IC") | (df["Grade"] == "OVI") | (df["Grade"] == "IP") | (df["Grade"] == "W")])
-
-        table_dict = {
-            "Final GPA": dp3_gpa,
-            "Degree Classification": degree_class,
-            "Your GPA (To 4 d.p.)": dp4_gpa,
-            "No. of CUs used to calculate GPA": total_cus_gpa,
-            "Total No. of CUs completed successfully": total_completed_cus,
-            "Total No. of courses attempted (A + B + C + D)": complete_total_mods,
-            "No. of courses accounted for in GPA (A)": conv_mods,
-            "No. of courses which were S/Ued (B)": sued_mods,
-            "No. of CS/CU/OVS/OVU courses taken (C)": cscu_mods,
-            "No. of courses with a 'EXE', 'IC', 'OVI', 'IP' or 'W' grade (D)": unrq_mods,
-            "Date of Overview": datetime.datetime.now().strftime("%d %b %Y")
-        }
-
-        col_fill_colors = ["azure"]*2 + ["lavender"]*3 + ["cornsilk"]*5 + ["honeydew"]
-        font_colors = ["mediumblue"]*2 + ["indigo"]*3 + ["saddlebrown"]*5 + ["darkgreen"]
-
-        fig = go.Figure(
-            data = [
-                go.Table(
-                    columnwidth = [2.5, 1.5],
-                    header = dict(
-                        values = ["<b>Course and GPA Summary Metrics<b>", "<b>Value<b>"],
-                        fill_color = "navy",
-                        line_color = "black",
-                        align = "center",
-                        font = dict(color = "white", size = 14, family = "Arial")
-                    ),
-                    cells = dict(
-                        values = [list(table_dict.keys()), list(table_dict.values())], 
-                        fill_color = [col_fill_colors, col_fill_colors],
-                        line_color = "black",
-                        align = ["right", "left"],
-                        font = dict(color = [font_colors, font_colors], size = [14, 14], family = "Arial"),
-                        height = 25
-                    )
-                )
-            ]
-        )
+        with goal_col:
+            goals = {"Highest possible GPA": None} | {f"{k} (GPA ≥ {v})": v for k, v in DEGREE_CLASSES.items()}
+            goal = st.selectbox("Goal:", goals)
 
-        fig.update_layout(height = 318, width = 700, margin = dict(l = 5, r = 5, t = 5, b = 5))
-        st.plotly_chart(fig, use_container_width = True)
+        row_labels = [f"{i+1}. {code} ({grade})" for i, (code, grade) in enumerate(zip(df["Course Code"], df["Grade"]))]
+        locked = st.multiselect("Courses which cannot be S/Ued:", range(len(df)), format_func = lambda i: row_labels[i])
 
-        # Create an in-memory buffer
-        buffer = io.BytesIO()
+        if st.button("Plan S/U"):
+            with phase("optimize_su"):
+                plan = optimize_su(df, budget_cus, eligible = [i not in locked for i in range(len(df))], target = goals[goal])
 
-        # Save the figure as a pdf to the buffer
-        fig.write_image(file = buffer, scale = 6, format = "pdf")
+            if plan is None:
+                st.error("❌ Not reachable by S/Uing courses within your S/U allowance.")
+            elif not plan.courses and goals[goal] is not None:
+                st.success(f"✅ Already reached without S/Uing any course: your GPA is **{round(plan.summary.gpa, 4)}** ({plan.summary.degree_class})")
+            elif not plan.courses:
+                st.info("S/Uing any of your courses would not raise your GPA.")
+            else:
+                st.success(f"✅ S/U {len(plan.courses)} course(s) ({plan.su_cus} CUs) for a GPA of **{round(plan.summary.gpa, 4)}** ({plan.summary.degree_class})")
+                st.dataframe(df.iloc[plan.courses][["Course Code", "Course Title", "No. of CUs", "Grade"]], hide_index = True, use_container_width = True)
 
-        # Download the pdf from the buffer
-        st.download_button(
-            label = "Download as PDF",
-            data = buffer,
-            file_name = "gpa_overview.pdf",
-            mime = "application/octet-stream",
-            help = "Downloads all course details as a PDF File"
-        )
 
-    st.markdown("---")
-                       
-            
+@instrumented("forecast")
 def forecast(current_year, current_mth_day):
     st.markdown("#### 📈 &nbsp; Future GPA Forecast")
     st.markdown("If you provide your current GPA, the number of units used for its calculation (*You can obtain both by using the Current Course Tracker*), and select the courses you plan to take in the upcoming semester which count towards your GPA, you can view the minimum weighted-average unit grades required on all your new courses for you to obtain each classification of honours.")
@@ -400,19 +417,37 @@ def forecast(current_year, current_mth_day):
     with mc_col:
         current_cus = st.number_input('No. of CUs used to calculate current GPA (If any):', min_value = 0.0, max_value = 1000.0, value = 0.0, step = 0.5, format = "%0.1f")
 
-    if current_mth_day < "08-06":
-        latest_ay = f"{current_year-1}-{current_year}"
-    elif current_mth_day >= "08-06":
-        latest_ay = f"{current_year}-{current_year+1}"
+    latest_ay = academic_years(current_year, current_mth_day)[-1]
+
+    with phase("get_initial_data"):
+        latest_ay_data = get_initial_data(latest_ay)
+
+    cu_latest_dict = latest_ay_data.with_credits()
+
+    future_index = cu_latest_dict.search_index
 
-    latest_ay_data = get_initial_data(latest_ay)
+    future_query = st.text_input("Search for future courses you are planning to take (by course code or title):")
 
-    cu_latest_dict = {course["moduleCode"]: [course["title"], float(course["moduleCredit"])] for course in latest_ay_data if float(course["moduleCredit"]) != 0}
+    if "future_selection" not in st.session_state:
+        st.session_state["future_selection"] = []
 
-    future_courses = st.multiselect(f"Select future courses you are planning to take which count towards your GPA (can type to search):", 
-                                      cu_latest_dict,
+    # Courses already selected stay in the options so the multiselect keeps them across searches
+    chosen_courses = st.session_state["future_selection"]
+    with phase("course_search"):
+        future_options = chosen_courses + [code for code in future_index.search(future_query) if code not in chosen_courses]
+
+    # The selection is saved before the rerun, as the widget is rebuilt (and reset to its default) whenever
+    # the options or default change, which would otherwise drop the pick that caused the rerun
+    def save_future_selection():
+        st.session_state["future_selection"] = st.session_state["future_courses"]
+
+    future_courses = st.multiselect(f"Select future courses you are planning to take which count towards your GPA:", 
+                                      future_options,
+                                      default = chosen_courses,
                                       max_selections = 15,
-                                      format_func = lambda key: key + f" - {str(cu_latest_dict[key][0])} [{str(cu_latest_dict[key][1])} CUs]")
+                                      format_func = future_index.label,
+                                      key = "future_courses",
+                                      on_change = save_future_selection)
     
     def future_course_details(mod_code):
         mod_title = cu_latest_dict[mod_code][0]
@@ -450,51 +485,12 @@ def forecast(current_year, current_mth_day):
                 "🎓 Pass": 2.00
             }
 
-            # Function to calculate the new GPA if all new courses get the same grade
-            def calculate_new_gpa_same_grade(grade_point, current_gpa, current_cus, new_cus):
-                total_grade_points = current_gpa * current_cus + grade_point * new_cus
-                return round(total_grade_points / (current_cus + new_cus), 4) if (current_cus + new_cus) > 0 else 0
-            
-            # Function to calculate the minimum weighted average GPA for new courses for a target GPA
-            def req_weighted_grade_points(target_gpa, current_gpa, current_cus, new_cus):
-                new_grade_points_req = target_gpa * (current_cus + new_cus) - current_gpa * current_cus
-                new_courses_only_gpa = new_grade_points_req / new_cus
-                if new_courses_only_gpa <= 5.0 and new_courses_only_gpa >= 0.0:
-                    return round(new_courses_only_gpa, 4)
-                else:
-                    return "Impossible"
-            
-            # Function to determine the average letter grades required from the new weighted average GPA
-            def points_to_grade_range(req_gpa):
-                # Define letter grade to point grade mapping
-                grade_gpa_dict = {5.0: "A+/A", 4.5: "A-", 4.0: "B+", 3.5: "B", 3.0: "B-", 2.5: "C+", 2.0: "C", 1.5: "D+", 1.0: "D", 0.0: "F"}
-                if req_gpa in grade_gpa_dict.keys():
-                    return f"exactly {grade_gpa_dict[req_gpa]}"
-                else:
-                    sorted_points = sorted(grade_gpa_dict.keys(), reverse=True)
-
-                    for i in range(len(sorted_points) - 1):
-                        upper = sorted_points[i]
-                        lower = sorted_points[i + 1]
-                        if lower < req_gpa < upper:
-                            letter1 = grade_gpa_dict[lower]
-                            letter2 = grade_gpa_dict[upper]
-                            if abs(req_gpa - lower) == abs(req_gpa - upper):
-                                return f"exactly between {letter1} and {letter2}"
-                            else:
-                                closest_letter = letter1 if abs(req_gpa - lower) < abs(req_gpa - upper) else letter2
-                                return f"between {letter1} and {letter2}, closer to {closest_letter}"
-
-                    if req_gpa >= max(sorted_points):
-                        return f"at least {grade_gpa_dict[max(sorted_points)]}"
-                    elif req_gpa <= min(sorted_points):
-                        return f"at most {grade_gpa_dict[min(sorted_points)]}"
-
-                    # Exact match fallback
-                    return f"exactly {grade_gpa_dict.get(req_gpa, 'Unknown')}"
-
             new_courses_all_a = calculate_new_gpa_same_grade(5, current_gpa, current_cus, new_cus)
             new_courses_all_f = calculate_new_gpa_same_grade(0, current_gpa, current_cus, new_cus)
+
+            # Share of all grade combinations over the selected courses which reach each classification
+            with phase("grade_scenarios"):
+                scenarios = grade_scenarios(future_df["No. of CUs"].tolist(), current_gpa, current_cus, thresholds = honours_classes)
     
             # Display course information summary as metrics
             st.markdown("### GPA Forecast Results")
@@ -521,6 +517,7 @@ def forecast(current_year, current_mth_day):
                     st.success("✅ Possible")
                     st.markdown(f"Your unit-weighted average GPA among all new courses must be at least **{req_new_gpa}**")
                     st.markdown(f"Your unit-weighted average grade among all new courses taken should be **{points_to_grade_range(req_new_gpa)}**")
+                    st.markdown(f"**{scenarios.probabilities[k]:.2%}** of the {scenarios.combinations:,} possible grade combinations for your new courses reach this classification")
                 else:
                     st.error("❌ Impossible to achieve with current GPA and selected courses.")
 
@@ -575,3 +572,7 @@ def explain():
 if __name__ == "__main__":
     st.set_page_config(page_title = "NUS GPA Insight", page_icon = "🧐")
     main()
+
+    # Shown after the run has been recorded, so the panel includes it
+    if DEBUG:
+        debug_panel()
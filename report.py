@@ -0,0 +1,136 @@
+import hashlib
+import json
+import zlib
+
+
+# Colour bands of the "Course and GPA Summary Metrics" table (one entry per row)
+ROW_FILL_COLORS = ["azure"]*2 + ["lavender"]*3 + ["cornsilk"]*5 + ["honeydew"]
+ROW_FONT_COLORS = ["mediumblue"]*2 + ["indigo"]*3 + ["saddlebrown"]*5 + ["darkgreen"]
+
+NAMED_COLORS = {
+    "azure": (240, 255, 255),
+    "lavender": (230, 230, 250),
+    "cornsilk": (255, 248, 220),
+    "honeydew": (240, 255, 240),
+    "navy": (0, 0, 128),
+    "mediumblue": (0, 0, 205),
+    "indigo": (75, 0, 130),
+    "saddlebrown": (139, 69, 19),
+    "darkgreen": (0, 100, 0),
+    "black": (0, 0, 0),
+    "white": (255, 255, 255)
+}
+
+# Glyph widths (1/1000 em) of the standard Helvetica fonts for characters 32-126, from the Adobe core font metrics
+HELVETICA_WIDTHS = [278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278, 556, 556, 556, 556,
+                    556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556, 1015, 667, 667, 722, 722, 667, 611, 778,
+                    722, 278, 500, 667, 556, 833, 722, 778, 667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278,
+                    278, 278, 469, 556, 333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+                    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584]
+HELVETICA_BOLD_WIDTHS = [278, 333, 474, 556, 556, 889, 722, 238, 333, 333, 389, 584, 278, 333, 278, 278, 556, 556, 556, 556,
+                         556, 556, 556, 556, 556, 556, 333, 333, 584, 584, 584, 611, 975, 722, 722, 722, 722, 667, 611, 778,
+                         722, 278, 556, 722, 611, 833, 722, 778, 667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 333,
+                         278, 333, 584, 556, 333, 556, 611, 556, 611, 556, 333, 611, 611, 278, 278, 556, 278, 889, 611, 611,
+                         611, 611, 389, 556, 333, 611, 556, 778, 556, 556, 500, 389, 280, 389, 584]
+
+
+def text_width(text, size, bold = False):
+    widths = HELVETICA_BOLD_WIDTHS if bold else HELVETICA_WIDTHS
+    return sum(widths[ord(c) - 32] if 32 <= ord(c) <= 126 else 556 for c in text) * size / 1000
+
+
+def _pdf_string(text):
+    # Literal PDF string in WinAnsi encoding
+    escaped = text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+    return "(" + escaped.encode("cp1252", errors = "replace").decode("latin-1") + ")"
+
+
+def _rgb(name):
+    r, g, b = NAMED_COLORS[name]
+    return f"{r / 255:.4f} {g / 255:.4f} {b / 255:.4f}"
+
+
+class _Canvas:
+    # Minimal PDF content stream builder (origin at the top left, y growing downwards)
+    def __init__(self, height):
+        self.height = height
+        self.ops = []
+
+    def rect(self, x, y, w, h, fill, stroke = "black"):
+        self.ops.append(f"{_rgb(fill)} rg {_rgb(stroke)} RG 0.5 w {x:.2f} {self.height - y - h:.2f} {w:.2f} {h:.2f} re B")
+
+    def text(self, x, y, text, size, color, bold = False):
+        font = "F2" if bold else "F1"
+        self.ops.append(f"BT /{font} {size:.2f} Tf {_rgb(color)} rg {x:.2f} {self.height - y:.2f} Td {_pdf_string(text)} Tj ET")
+
+    def content(self):
+        return "\n".join(self.ops).encode("latin-1")
+
+
+def _write_pdf(width, height, content):
+    stream = zlib.compress(content)
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {width} {height}] /Contents 4 0 R /Resources << /Font << /F1 5 0 R /F2 6 0 R >> >> >>".encode("latin-1"),
+        f"<< /Length {len(stream)} /Filter /FlateDecode >>\nstream\n".encode("latin-1") + stream + b"\nendstream",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>"
+    ]
+
+    out = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    offsets = []
+    for number, body in enumerate(objects, start = 1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n".encode("latin-1") + body + b"\nendobj\n"
+
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1")
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode("latin-1")
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("latin-1")
+
+    return bytes(out)
+
+
+def summary_key(table_dict):
+    """Cache key of a rendered summary, derived from its contents."""
+    return "pdf:" + hashlib.sha256(json.dumps(table_dict, default = str).encode("utf-8")).hexdigest()
+
+
+def summary_pdf(table_dict, width = 700, margin = 5, header_height = 28, row_height = 25, font_size = 14):
+    """Renders the GPA summary table directly as a single page vector PDF, with the same layout and colours
+    as the Plotly table in the app but without a browser process.
+    in:  dict of summary metric -> value
+    out: pdf bytes
+    """
+    height = 2 * margin + header_height + row_height * len(table_dict)
+    col_widths = [(width - 2 * margin) * 2.5 / 4, (width - 2 * margin) * 1.5 / 4]
+    padding = 8
+
+    canvas = _Canvas(height)
+
+    # Header row
+    x = margin
+    for title, col_width in zip(["Course and GPA Summary Metrics", "Value"], col_widths):
+        canvas.rect(x, margin, col_width, header_height, fill = "navy")
+        canvas.text(x + (col_width - text_width(title, font_size, bold = True)) / 2, margin + header_height / 2 + font_size * 0.35, title, font_size, "white", bold = True)
+        x += col_width
+
+    # Metric rows: metric names right aligned, values left aligned
+    for i, (metric, value) in enumerate(table_dict.items()):
+        y = margin + header_height + i * row_height
+        fill = ROW_FILL_COLORS[i % len(ROW_FILL_COLORS)]
+        color = ROW_FONT_COLORS[i % len(ROW_FONT_COLORS)]
+        baseline = y + row_height / 2 + font_size * 0.35
+
+        metric, value = str(metric), str(value)
+        metric_size = min(font_size, font_size * (col_widths[0] - 2 * padding) / max(text_width(metric, font_size), 1))
+        value_size = min(font_size, font_size * (col_widths[1] - 2 * padding) / max(text_width(value, font_size), 1))
+
+        canvas.rect(margin, y, col_widths[0], row_height, fill = fill)
+        canvas.text(margin + col_widths[0] - padding - text_width(metric, metric_size), baseline, metric, metric_size, color)
+
+        canvas.rect(margin + col_widths[0], y, col_widths[1], row_height, fill = fill)
+        canvas.text(margin + col_widths[0] + padding, baseline, value, value_size, color)
+
+    return _write_pdf(width, height, canvas.content())
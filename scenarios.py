@@ -0,0 +1,125 @@
+from fractions import Fraction
+from math import gcd
+from typing import NamedTuple
+
+import numpy as np
+
+from gpa import DEGREE_CLASSES, GRADES_TO_GPA
+
+
+# Distinct grade points a GPA-counted course can receive (A+ and A are both 5.0)
+GRADE_POINT_LEVELS = sorted(set(gp for gp in GRADES_TO_GPA.values() if gp is not None), reverse = True)
+
+# Above this many distinct CU-weighted sums the exact dynamic program hands over to Monte Carlo
+MAX_EXACT_STATES = 2_000_000
+
+
+class ScenarioResult(NamedTuple):
+    method: str
+    combinations: int
+    probabilities: dict
+    counts: dict
+
+
+def integer_scale(values):
+    # Smallest integer multiplier which makes every value an integer (e.g. 2 for half CUs)
+    denominator = 1
+    for value in values:
+        d = Fraction(value).limit_denominator(1000).denominator
+        denominator = denominator * d // gcd(denominator, d)
+    return denominator
+
+
+def _level_probabilities(distribution):
+    # Collapses a {letter grade or grade points: weight} distribution onto GRADE_POINT_LEVELS
+    probs = np.zeros(len(GRADE_POINT_LEVELS))
+    for grade, weight in distribution.items():
+        gp = GRADES_TO_GPA[grade] if isinstance(grade, str) else float(grade)
+        if gp is None:
+            raise ValueError(f"Grade {grade} does not count towards GPA")
+        probs[GRADE_POINT_LEVELS.index(gp)] += weight
+
+    if probs.sum() <= 0:
+        raise ValueError("Grade distribution must have a positive total weight")
+
+    return probs / probs.sum()
+
+
+def _class_thresholds(sums, current_points, total_cus, thresholds):
+    # Degree classes are decided on the overall GPA rounded to 3 d.p., like degree_classification
+    final_gpa = np.round((current_points + sums) / total_cus, 3)
+    return {name: final_gpa >= threshold for name, threshold in thresholds.items()}
+
+
+def grade_scenarios(course_cus, current_gpa = 0.0, current_cus = 0.0, distributions = None,
+                    thresholds = DEGREE_CLASSES, samples = 200_000, seed = None, max_states = MAX_EXACT_STATES):
+    """Share of grade assignments over the new courses which reach each degree classification.
+
+    With no distributions every grade point level is equally likely, so the probabilities are the share of the
+    len(GRADE_POINT_LEVELS) ** n assignments, and counts holds the exact number of assignments reaching each class.
+    Otherwise distributions gives one {letter grade or grade points: weight} dict per course.
+
+    The exact method runs a dynamic program over the integer CU-weighted grade point sums (CUs and grade points
+    scaled to integers), which is O(n * levels * states) instead of levels ** n. If the sums do not fit in
+    max_states, a vectorized Monte Carlo estimate over `samples` draws is returned instead.
+    """
+    course_cus = [float(cus) for cus in course_cus]
+    n = len(course_cus)
+    total_cus = current_cus + sum(course_cus)
+    current_points = current_gpa * current_cus
+    combinations = len(GRADE_POINT_LEVELS) ** n
+
+    if total_cus <= 0:
+        raise ValueError("Total CUs must be positive")
+
+    if distributions is None:
+        level_probs = [np.full(len(GRADE_POINT_LEVELS), 1 / len(GRADE_POINT_LEVELS))] * n
+    else:
+        if len(distributions) != n:
+            raise ValueError("Expected one grade distribution per course")
+        level_probs = [_level_probabilities(d) for d in distributions]
+
+    cu_scale = integer_scale(course_cus)
+    gp_scale = integer_scale(GRADE_POINT_LEVELS)
+    units = [round(cus * cu_scale) for cus in course_cus]
+    levels = [round(gp * gp_scale) for gp in GRADE_POINT_LEVELS]
+    n_states = sum(units) * max(levels) + 1
+
+    if n_states <= max_states and all(np.isclose(u, cus * cu_scale) for u, cus in zip(units, course_cus)):
+        counting = distributions is None
+
+        # dp[s] = number (or probability) of assignments so far whose scaled weighted sum is s
+        dp = np.zeros(n_states, dtype = object if counting and combinations >= 2**63 else (np.int64 if counting else np.float64))
+        dp[0] = 1
+        reach = 0
+        for u, probs in zip(units, level_probs):
+            new = np.zeros_like(dp)
+            for level, p in zip(levels, probs):
+                shift = u * level
+                new[shift:reach + shift + 1] += dp[:reach + 1] if counting else dp[:reach + 1] * p
+            dp = new
+            reach += u * max(levels)
+
+        sums = np.arange(n_states) / (cu_scale * gp_scale)
+        masks = _class_thresholds(sums, current_points, total_cus, thresholds)
+
+        if counting:
+            counts = {name: int(dp[mask].sum()) for name, mask in masks.items()}
+            probabilities = {name: count / combinations for name, count in counts.items()}
+        else:
+            counts = None
+            probabilities = {name: float(dp[mask].sum()) for name, mask in masks.items()}
+
+        return ScenarioResult("exact", combinations, probabilities, counts)
+
+    # Monte Carlo fallback: sample a grade point level per course for every draw at once
+    rng = np.random.default_rng(seed)
+    gp_levels = np.array(GRADE_POINT_LEVELS)
+    sums = np.zeros(samples)
+    for cus, probs in zip(course_cus, level_probs):
+        sums += cus * gp_levels[rng.choice(len(gp_levels), size = samples, p = probs)]
+
+    masks = _class_thresholds(sums, current_points, total_cus, thresholds)
+    probabilities = {name: float(mask.mean()) for name, mask in masks.items()}
+
+    return ScenarioResult("monte carlo", combinations, probabilities, None)
@@ -0,0 +1,307 @@
+"""Stateless GPA scoring service.
+
+Serves the Course Tracker GPA summary (grades_to_gpa, degree classification) and the GPA forecast
+(req_weighted_grade_points, points_to_grade_range) over HTTP, without Streamlit. Each POST /score
+carries a batch of students, which is split into chunks and scored in a process pool. Course CUs
+which are not given are looked up in the memory-mapped catalog of the course's AY, so the workers
+share one copy of each catalog.
+
+    python service.py --port 8000 --workers 4
+
+    POST /score  {"ay": "2024-2025",
+                  "students": [{"id": "A0123456X",
+                                "courses": [{"code": "CS1010", "grade": "A-"}, {"code": "GEA1000", "grade": "S", "ay": "2023-2024"}],
+                                "new_cus": 20}]}
+    GET  /grades, GET /health
+"""
+import argparse
+import datetime
+import json
+import logging
+import math
+import multiprocessing
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+from catalog import CatalogPrefetcher, academic_years, load_mapped_catalog
+from gpa import CSCU, DEGREE_CLASSES, GRADE_POINTS, GRADES, GRADES_TO_GPA, IN_GPA, NOT_COMPLETED, OTHER, SU, calculate_new_gpa_same_grade, grade_codes, points_to_grade_range, req_weighted_grade_points
+from trajectory import degree_classes
+
+
+logger = logging.getLogger(__name__)
+
+# Largest request body accepted, and students scored per pool task
+MAX_BODY_BYTES = 32 * 1024 * 1024
+DEFAULT_CHUNKSIZE = 256
+
+# Memory-mapped catalogs of this process, by AY
+_catalogs = {}
+_catalogs_lock = threading.Lock()
+
+
+def _catalog(rel_years):
+    with _catalogs_lock:
+        if rel_years not in _catalogs:
+            _catalogs[rel_years] = load_mapped_catalog(rel_years)
+        return _catalogs[rel_years]
+
+
+def forecast(current_gpa, current_cus, new_cus):
+    """GPA needed over new_cus of new courses for each degree classification, as shown in the Future GPA Forecast."""
+    if not current_cus:
+        current_gpa = 0.0
+    classes = {}
+    for degree_class, threshold in DEGREE_CLASSES.items():
+        required = req_weighted_grade_points(threshold, current_gpa, current_cus, new_cus)
+        classes[degree_class] = {"possible": required != "Impossible",
+                                 "required_gpa": None if required == "Impossible" else required,
+                                 "grade_range": None if required == "Impossible" else points_to_grade_range(required)}
+
+    return {"new_cus": new_cus,
+            "gpa_if_all_a": calculate_new_gpa_same_grade(5, current_gpa, current_cus, new_cus),
+            "gpa_if_all_f": calculate_new_gpa_same_grade(0, current_gpa, current_cus, new_cus),
+            "classes": classes}
+
+
+def _lookup_cus(codes, years, cus, errors, owners):
+    # Fills in missing CUs with one vectorized search of each AY's catalog
+    missing = np.flatnonzero(np.isnan(cus))
+    year_ids, year_names = pd.factorize(years[missing])
+
+    for k, rel_years in enumerate(year_names):
+        rows = missing[year_ids == k]
+        try:
+            catalog = _catalog(rel_years)
+        except Exception as e:
+            for s in np.unique(owners[rows]).tolist():
+                errors.setdefault(s, f"no course data for AY {rel_years} ({e})")
+            continue
+
+        wanted = codes[rows]
+        found = np.searchsorted(catalog.codes, wanted)
+        found[found >= len(catalog.codes)] = 0
+        known = catalog.codes[found] == wanted
+        cus[rows] = np.where(known, catalog.credits[found], np.nan)
+        for i in rows[~known].tolist():
+            errors.setdefault(int(owners[i]), f"unknown course {codes[i]} in AY {rel_years}")
+
+
+def score_students(students, default_ay, years):
+    """Scores a batch of students.
+
+    Courses of the whole batch are flattened into columns, missing CUs are looked up per AY, and the per-grade
+    CU totals and course counts of every student come from one bincount, and the summary columns from those totals.
+    A student whose AY (or the AY of any of their courses) is not one of `years` is reported as an error
+    rather than looked up, as the AY is part of the NUSMods URL and of the cache file names.
+    in:  list of student dicts ({"id", "courses": [{"code", "grade", "cus"?, "ay"?}], "ay"?, "new_cus"?}),
+         default AY of students without one, AYs which may be looked up
+    out: list of result dicts, in the same order
+    """
+    known_years = frozenset(years)
+    codes, grades, cus, course_years, owners = [], [], [], [], []
+    new_cus = [None] * len(students)
+    errors = {}
+    for s, student in enumerate(students):
+        try:
+            student_ay = student.get("ay", default_ay)
+            courses = student.get("courses", [])
+            student_cus = np.array([course.get("cus") for course in courses], dtype = np.float64)
+            student_codes = [course.get("code") for course in courses]
+            student_grades = [course.get("grade") for course in courses]
+            student_years = [course.get("ay", student_ay) for course in courses]
+            new_cus[s] = float(student["new_cus"]) if student.get("new_cus") else None
+        except (AttributeError, TypeError, ValueError) as e:
+            errors[s] = f"invalid student record ({e})"
+            continue
+        unknown = next((ay for ay in [student_ay, *student_years] if not (isinstance(ay, str) and ay in known_years)), None)
+        if unknown is not None:
+            errors[s] = f"unknown AY {unknown!r}"
+            continue
+        codes += student_codes
+        grades += student_grades
+        course_years += student_years
+        cus.append(student_cus)
+        owners.append(np.full(len(courses), s))
+
+    codes = np.char.upper(np.char.strip(np.array(codes, dtype = str)))
+    cus = np.concatenate(cus) if cus else np.zeros(0)
+    owners = np.concatenate(owners) if owners else np.zeros(0, dtype = np.int64)
+    _lookup_cus(codes, np.array(course_years, dtype = object), cus, errors, owners)
+
+    # Anything but a letter grade string is an unknown grade
+    grades = [grade if isinstance(grade, str) else None for grade in grades]
+    codes_by_grade = grade_codes(grades)
+    for i in np.flatnonzero(codes_by_grade < 0):
+        errors.setdefault(int(owners[i]), f"unknown grade {grades[i]!r}")
+
+    # Per-student, per-grade CU totals and course counts, and every summary column from those at once
+    n_grades = len(GRADES)
+    known = codes_by_grade >= 0
+    cells = owners[known] * n_grades + codes_by_grade[known]
+    # (bincount gives integers rather than float totals when there are no courses at all)
+    cus_per_grade = np.bincount(cells, weights = np.nan_to_num(cus[known]), minlength = len(students) * n_grades).astype(np.float64).reshape(-1, n_grades)
+    count_per_grade = np.bincount(cells, minlength = len(students) * n_grades).reshape(-1, n_grades)
+    total_cus = np.bincount(owners, weights = np.nan_to_num(cus), minlength = len(students)).astype(np.float64)
+
+    gpa_cus = cus_per_grade[:, IN_GPA].sum(axis = 1)
+    with np.errstate(divide = "ignore", invalid = "ignore"):
+        gpa = np.where(gpa_cus > 0, cus_per_grade[:, IN_GPA] @ GRADE_POINTS[IN_GPA] / gpa_cus, np.nan)
+    columns = {"gpa": [None if math.isnan(g) else g for g in gpa.tolist()],
+               "degree_class": degree_classes(gpa).tolist(),
+               "gpa_cus": gpa_cus.tolist(),
+               "completed_cus": (total_cus - cus_per_grade[:, NOT_COMPLETED].sum(axis = 1)).tolist(),
+               "total_courses": np.bincount(owners, minlength = len(students)).tolist(),
+               "gpa_courses": count_per_grade[:, IN_GPA].sum(axis = 1).tolist(),
+               "su_courses": count_per_grade[:, SU].sum(axis = 1).tolist(),
+               "cscu_courses": count_per_grade[:, CSCU].sum(axis = 1).tolist(),
+               "other_courses": count_per_grade[:, OTHER].sum(axis = 1).tolist()}
+
+    results = []
+    for s, (student, values) in enumerate(zip(students, zip(*columns.values()))):
+        student_id = student.get("id") if isinstance(student, dict) else None
+        if s in errors:
+            results.append({"id": student_id, "status": f"error: {errors[s]}"})
+            continue
+
+        result = {"id": student_id, "status": "ok"}
+        result.update(zip(columns, values))
+        if new_cus[s]:
+            result["forecast"] = forecast(result["gpa"] or 0.0, result["gpa_cus"], new_cus[s])
+        results.append(result)
+
+    return results
+
+
+class ScoringServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address = ("127.0.0.1", 8000), workers = None, chunksize = DEFAULT_CHUNKSIZE, years = None):
+        now = datetime.datetime.now()
+        self.years = academic_years(now.year, now.strftime("%m-%d")) if years is None else years
+        self.default_ay = self.years[-1]
+        self.chunksize = chunksize
+
+        # The compiled catalog files are built once here, so the workers only map them
+        prefetcher = CatalogPrefetcher(self.years, loader = load_mapped_catalog)
+        for rel_years in self.years:
+            try:
+                _catalogs[rel_years] = prefetcher.get(rel_years)
+            except Exception:
+                logger.exception("Could not load course data for AY %s", rel_years)
+
+        # Workers are spawned rather than forked from this multi-threaded process; with no workers, batches are scored in the request thread
+        self.pool = ProcessPoolExecutor(workers, mp_context = multiprocessing.get_context("spawn")) if workers != 0 else None
+        super().__init__(address, _Handler)
+
+    @property
+    def url(self):
+        return f"http://{self.server_address[0]}:{self.server_address[1]}"
+
+    def score(self, students, default_ay):
+        chunks = [students[i:i + self.chunksize] for i in range(0, len(students), self.chunksize)]
+        if self.pool is None:
+            return [result for chunk in chunks for result in score_students(chunk, default_ay, self.years)]
+
+        futures = [self.pool.submit(score_students, chunk, default_ay, self.years) for chunk in chunks]
+        return [result for future in futures for result in future.result()]
+
+    def start(self):
+        # Serves from a daemon thread until shutdown()
+        threading.Thread(target = self.serve_forever, name = "scoring-service", daemon = True).start()
+        return self
+
+    def server_close(self):
+        super().server_close()
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures = True)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes, which Nagle's algorithm would hold back on keep-alive connections
+    disable_nagle_algorithm = True
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload, separators = (",", ":")).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send_json(200, {"status": "ok", "years": self.server.years})
+        elif self.path == "/grades":
+            self._send_json(200, {"grades_to_gpa": GRADES_TO_GPA, "degree_classes": DEGREE_CLASSES})
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        if self.path != "/score":
+            self._send_json(404, {"error": "not found"})
+            return
+
+        # Without a valid length the body cannot be skipped, so the connection is closed after the error
+        length = self.headers.get("Content-Length")
+        if length is None:
+            self.close_connection = True
+            self._send_json(411, {"error": "Content-Length is required"})
+            return
+        if not (length.isascii() and length.isdigit()):
+            self.close_connection = True
+            self._send_json(400, {"error": f"invalid Content-Length {length!r}"})
+            return
+        if int(length) > MAX_BODY_BYTES:
+            self.close_connection = True
+            self._send_json(413, {"error": f"request body is larger than {MAX_BODY_BYTES} bytes"})
+            return
+
+        try:
+            request = json.loads(self.rfile.read(int(length)))
+            students = request["students"]
+            if not isinstance(students, list):
+                raise TypeError("students must be a list")
+        except (ValueError, KeyError, TypeError) as e:
+            self._send_json(400, {"error": f"invalid request ({e})"})
+            return
+
+        try:
+            results = self.server.score(students, request.get("ay", self.server.default_ay))
+        except Exception as e:
+            logger.exception("Scoring failed")
+            self._send_json(500, {"error": str(e)})
+            return
+
+        self._send_json(200, {"results": results})
+
+    def log_message(self, format, *args):
+        logger.debug(format, *args)
+
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description = __doc__, formatter_class = argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default = "127.0.0.1")
+    parser.add_argument("--port", type = int, default = 8000)
+    parser.add_argument("-w", "--workers", type = int, default = None, help = "worker processes (default: CPU count, 0 scores in the request threads)")
+    parser.add_argument("--chunksize", type = int, default = DEFAULT_CHUNKSIZE, help = "students per worker task")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level = logging.INFO)
+    server = ScoringServer((args.host, args.port), workers = args.workers, chunksize = args.chunksize)
+    print(f"Scoring service on {server.url}", file = sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from gpa import GRADES_TO_GPA, summarize
+from scenarios import integer_scale
+
+
+# Default NUS S/U allowance in CUs
+DEFAULT_SU_BUDGET = 32.0
+
+# Lowest grade points which are converted to "S" (C and above), anything below becomes "U"
+S_MIN_GRADE_POINTS = 2.0
+
+
+class SUPlan(NamedTuple):
+    courses: list
+    su_cus: float
+    summary: object
+    records: list
+
+
+def _rows(records):
+    if isinstance(records, pd.DataFrame):
+        return records.astype(object).where(records.notna(), None).values.tolist()
+    return [list(row) for row in records]
+
+
+def apply_su(rows, chosen):
+    """Returns a copy of the tracker rows with the chosen row indices S/Ued."""
+    rows = [list(row) for row in rows]
+    for i in chosen:
+        rows[i][3] = "S" if GRADES_TO_GPA[rows[i][3]] >= S_MIN_GRADE_POINTS else "U"
+        rows[i][4] = None
+
+    return rows
+
+
+def optimize_su(records, budget_cus = DEFAULT_SU_BUDGET, eligible = None, target = None):
+    """Chooses which graded courses to S/U within a CU budget.
+
+    Without a target the GPA is maximised. With a target GPA threshold (e.g. 4.0 for Honours (Distinction)),
+    the plan reaching it (at 3 d.p.) with the fewest S/Ued CUs is returned, or None if no plan reaches it.
+
+    The GPA after S/Uing a set of courses is (P - points removed) / (C - CUs removed), so an exact knapsack-style
+    dynamic program finds, for every total of S/Ued CUs up to the budget, the set removing the fewest grade points.
+    The best total is then picked, which is O(courses * budget) rather than 2 ** courses.
+    in:  tracker rows or dataframe, optional per-row eligibility flags
+    out: SUPlan
+    """
+    rows = _rows(records)
+    if eligible is None:
+        eligible = [True] * len(rows)
+
+    # Candidates are eligible courses which count towards GPA
+    candidates = [i for i, row in enumerate(rows) if eligible[i] and GRADES_TO_GPA.get(row[3]) is not None and pd.notna(row[2]) and row[2] > 0]
+    base = summarize(rows)
+    total_points = 0.0 if np.isnan(base.gpa) else base.gpa * base.gpa_cus
+
+    scale = integer_scale([rows[i][2] for i in candidates] + [budget_cus])
+    capacity = int(round(budget_cus * scale))
+    weights = [int(round(rows[i][2] * scale)) for i in candidates]
+    values = [rows[i][2] * GRADES_TO_GPA[rows[i][3]] for i in candidates]
+
+    # removed[w] = fewest grade points removed by S/Uing courses totalling exactly w scaled CUs
+    removed = np.full(capacity + 1, np.inf)
+    removed[0] = 0.0
+    taken = np.zeros((len(candidates), capacity + 1), dtype = bool)
+    for k, (weight, value) in enumerate(zip(weights, values)):
+        if weight > capacity:
+            continue
+        option = np.full(capacity + 1, np.inf)
+        option[weight:] = removed[:capacity + 1 - weight] + value
+        better = option < removed
+        taken[k] = better
+        removed = np.where(better, option, removed)
+
+    # GPA for every reachable S/Ued CU total (all CUs S/Ued leaves no GPA)
+    su_cus = np.arange(capacity + 1) / scale
+    remaining_cus = base.gpa_cus - su_cus
+    with np.errstate(divide = "ignore", invalid = "ignore"):
+        gpa = np.where(np.isfinite(removed) & (remaining_cus > 0), (total_points - removed) / remaining_cus, -np.inf)
+
+    if target is None:
+        best = int(np.argmax(gpa))
+    else:
+        reached = np.flatnonzero(np.round(gpa, 3) >= target)
+        if len(reached) == 0:
+            return None
+        best = int(reached[0])
+
+    # Walk back through the table to recover the chosen courses
+    chosen = []
+    w = best
+    for k in range(len(candidates) - 1, -1, -1):
+        if w > 0 and taken[k, w]:
+            chosen.append(candidates[k])
+            w -= weights[k]
+    chosen.sort()
+
+    su_rows = apply_su(rows, chosen)
+
+    return SUPlan(courses = chosen, su_cus = float(sum(rows[i][2] for i in chosen)), summary = summarize(su_rows), records = su_rows)
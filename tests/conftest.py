@@ -0,0 +1,32 @@
+import datetime
+import json
+import os
+import sys
+import time
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+@pytest.fixture
+def module_cache(tmp_path, monkeypatch):
+    """Fresh on-disk moduleInfo.json copies of every AY offered today, so the app never goes to NUSMods.
+    Course i of each AY is "ACC{i:04d}" ("Accounting Topic {i}") with 4 CUs.
+    """
+    import catalog
+
+    courses = [{"moduleCode": f"ACC{i:04d}", "title": f"Accounting Topic {i}", "moduleCredit": "4"} for i in range(200)]
+    now = datetime.datetime.now()
+    for rel_years in catalog.academic_years(now.year, now.strftime("%m-%d")):
+        data_path, meta_path = catalog._cache_paths(rel_years, str(tmp_path))
+        with open(data_path, "w") as f:
+            json.dump(courses, f)
+        with open(meta_path, "w") as f:
+            json.dump({"fetched_at": time.time()}, f)
+
+    monkeypatch.setattr(catalog, "CACHE_DIR", str(tmp_path))
+    # Nothing listens here, so a request that slips through fails rather than reaching NUSMods
+    monkeypatch.setattr(catalog, "NUSMODS_API", "http://127.0.0.1:9")
+    return courses
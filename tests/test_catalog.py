@@ -0,0 +1,55 @@
+import json
+
+import pytest
+import requests
+
+from catalog import fetch_module_info, iter_modules, load_mapped_catalog
+
+
+@pytest.mark.parametrize("raw", [b"[", b'[{"moduleCode": "CS1010"}', b'[{"moduleCode": "CS1010"},', b'[{"moduleCode": '])
+def test_iter_modules_rejects_truncated_payloads(raw):
+    with pytest.raises(ValueError, match = "Truncated"):
+        list(iter_modules(raw))
+
+
+@pytest.mark.parametrize("raw", [b"", b"<html></html>", b'[,{"a": 1}]', b'[{"a": 1},,{"b": 2}]', b'[{"a": 1},]', b'[{"a": 1} {"b": 2}]', b'[{"a": 1}]x'])
+def test_iter_modules_rejects_malformed_payloads(raw):
+    with pytest.raises(ValueError):
+        list(iter_modules(raw))
+
+
+def test_iter_modules_decodes_every_module():
+    assert list(iter_modules(b' [ {"a": 1} ,\n{"b": 2} ]\n')) == [{"a": 1}, {"b": 2}]
+    assert list(iter_modules("[]")) == []
+
+
+class FakeSession:
+    # Serves the given response bodies in turn, counting requests
+    def __init__(self, *bodies):
+        self.bodies = list(bodies)
+        self.calls = 0
+
+    def get(self, url, headers = None):
+        self.calls += 1
+        response = requests.Response()
+        response.status_code = 200
+        response._content = self.bodies.pop(0)
+        return response
+
+
+def test_invalid_payload_is_not_cached(tmp_path):
+    good = json.dumps([{"moduleCode": "CS1010", "title": "Programming Methodology", "moduleCredit": "4"}]).encode()
+
+    # Nothing cached yet: the bad body is an error, and the next call asks NUSMods again
+    session = FakeSession(good[:-5], good)
+    with pytest.raises(ValueError):
+        fetch_module_info("2024-2025", cache_dir = str(tmp_path), session = session)
+    assert fetch_module_info("2024-2025", cache_dir = str(tmp_path), session = session) == good
+    assert session.calls == 2
+
+    # A stale good copy is served in place of a bad body, and is still revalidated on the next call
+    session = FakeSession(b"<html>Bad gateway</html>", good)
+    assert fetch_module_info("2024-2025", cache_dir = str(tmp_path), ttl = 0, session = session) == good
+    assert fetch_module_info("2024-2025", cache_dir = str(tmp_path), ttl = 0, session = session) == good
+    assert session.calls == 2
+    assert load_mapped_catalog("2024-2025", cache_dir = str(tmp_path), session = FakeSession(good))["CS1010"] == ["Programming Methodology", 4.0]
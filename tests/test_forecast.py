@@ -0,0 +1,26 @@
+import os
+
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+from conftest import ROOT
+
+
+def test_future_courses_are_kept_across_picks(module_cache):
+    st.cache_resource.clear()
+    at = AppTest.from_file(os.path.join(ROOT, "main.py"), default_timeout = 60).run()
+    at.sidebar.radio[0].set_value("Future GPA Forecast").run()
+
+    # Several picks in a row straight from the listed options (each pick is the only rerun in between),
+    # then one found by searching
+    picked = []
+    for code in ["ACC0003", "ACC0001", "ACC0004", "ACC0000", "ACC0156"]:
+        if code == "ACC0156":
+            at.text_input[0].set_value(code).run()
+        at.multiselect[0].select(code).run()
+        picked.append(code)
+        assert at.multiselect[0].value == picked
+        assert at.session_state["future_selection"] == picked
+
+    assert not at.exception
+    assert at.dataframe[0].value["Course Code"].tolist() == picked
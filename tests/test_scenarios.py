@@ -0,0 +1,54 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from gpa import DEGREE_CLASSES
+from scenarios import GRADE_POINT_LEVELS, grade_scenarios
+
+
+def brute_force(course_cus, current_gpa, current_cus, distributions = None):
+    # Every assignment of a grade point level to each course, counted and weighted by its probability
+    total_cus = current_cus + sum(course_cus)
+    counts = dict.fromkeys(DEGREE_CLASSES, 0)
+    probabilities = dict.fromkeys(DEGREE_CLASSES, 0.0)
+
+    for assignment in itertools.product(range(len(GRADE_POINT_LEVELS)), repeat = len(course_cus)):
+        points = current_gpa * current_cus + sum(cus * GRADE_POINT_LEVELS[level] for cus, level in zip(course_cus, assignment))
+        weight = np.prod([distributions[i][GRADE_POINT_LEVELS[level]] for i, level in enumerate(assignment)]) if distributions else 1
+        for name, threshold in DEGREE_CLASSES.items():
+            if round(points / total_cus, 3) >= threshold:
+                counts[name] += 1
+                probabilities[name] += weight
+
+    return counts, probabilities
+
+
+def random_case(n, seed):
+    rng = np.random.default_rng(seed)
+    course_cus = rng.choice([2.0, 4.0, 4.0, 6.0, 0.5, 1.0], size = n).tolist()
+    current_gpa, current_cus = round(float(rng.uniform(2, 5)), 4), float(rng.choice([0, 20, 60]))
+    weights = rng.random((n, len(GRADE_POINT_LEVELS)))
+    distributions = [dict(zip(GRADE_POINT_LEVELS, w / w.sum())) for w in weights]
+    return course_cus, current_gpa, current_cus, distributions
+
+
+@pytest.mark.parametrize("n", [1, 2, 3, 4])
+@pytest.mark.parametrize("seed", range(3))
+def test_counts_match_brute_force(n, seed):
+    course_cus, current_gpa, current_cus, _ = random_case(n, seed)
+    counts, _ = brute_force(course_cus, current_gpa, current_cus)
+
+    result = grade_scenarios(course_cus, current_gpa, current_cus)
+    assert result.method == "exact"
+    assert result.counts == counts
+
+
+@pytest.mark.parametrize("n", [1, 2, 3, 4])
+@pytest.mark.parametrize("seed", range(3))
+def test_course_distributions_match_brute_force(n, seed):
+    course_cus, current_gpa, current_cus, distributions = random_case(n, seed)
+    _, probabilities = brute_force(course_cus, current_gpa, current_cus, distributions)
+
+    result = grade_scenarios(course_cus, current_gpa, current_cus, distributions)
+    assert result.probabilities == pytest.approx(probabilities)
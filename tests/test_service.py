@@ -0,0 +1,53 @@
+import datetime
+import json
+import socket
+
+import pytest
+import requests
+
+import catalog
+from service import ScoringServer
+
+
+@pytest.fixture
+def server(module_cache):
+    now = datetime.datetime.now()
+    server = ScoringServer(("127.0.0.1", 0), workers = 0, years = catalog.academic_years(now.year, now.strftime("%m-%d"))).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def raw_post(server, headers, body = b""):
+    # Sends a request with exactly the given headers, returning the status code
+    with socket.create_connection(server.server_address, timeout = 5) as conn:
+        conn.sendall(b"POST /score HTTP/1.1\r\nHost: test\r\n" + b"".join(f"{h}\r\n".encode() for h in headers) + b"\r\n" + body)
+        return int(conn.recv(65536).split(b" ", 2)[1])
+
+
+def test_unknown_years_are_per_student_errors(server, monkeypatch):
+    monkeypatch.setattr(catalog, "fetch_module_info", lambda *args, **kwargs: pytest.fail("NUSMods was asked for an unknown AY"))
+    course = {"code": "ACC0001", "grade": "A"}
+    students = [{"id": "ok", "courses": [course]},
+                {"id": "path", "ay": "../../whatever", "courses": [course]},
+                {"id": "list", "ay": ["2024-2025"], "courses": [course]},
+                {"id": "course", "courses": [course, dict(course, ay = "1900-1901")]}]
+
+    response = requests.post(server.url + "/score", json = {"students": students})
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert results[0]["status"] == "ok" and results[0]["gpa"] == 5.0
+    assert [result["status"].startswith("error: unknown AY") for result in results[1:]] == [True, True, True]
+
+    response = requests.post(server.url + "/score", json = {"ay": {"x": 1}, "students": students[:1]})
+    assert response.json()["results"][0]["status"].startswith("error: unknown AY")
+
+
+@pytest.mark.parametrize("headers, status", [([], 411), (["Content-Length: abc"], 400), (["Content-Length: -1"], 400), (["Content-Length: 1_0"], 400)])
+def test_invalid_content_length_is_rejected(server, headers, status):
+    assert raw_post(server, headers, b"{}") == status
+
+
+def test_valid_content_length_is_read(server):
+    body = json.dumps({"students": []}).encode()
+    assert raw_post(server, [f"Content-Length: {len(body)}"], body) == 200
@@ -0,0 +1,49 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from gpa import GRADES_TO_GPA, summarize
+from su_option import apply_su, optimize_su
+
+
+GRADED = [grade for grade, gp in GRADES_TO_GPA.items() if gp is not None]
+
+
+def make_rows(n, rng):
+    grades = rng.choice(GRADED + ["S", "CS", "IP"], size = n)
+    cus = rng.choice([2.0, 4.0, 4.0, 4.0, 6.0, 8.0], size = n)
+    return [[f"CS{i:04d}", "Synthetic Course", float(cu), str(grade), GRADES_TO_GPA[grade], "2024/2025"] for i, (cu, grade) in enumerate(zip(cus, grades))]
+
+
+def brute_force(rows, budget_cus, eligible):
+    # (GPA, S/Ued CUs) of every subset of eligible graded courses within the budget, including none
+    candidates = [i for i, row in enumerate(rows) if eligible[i] and GRADES_TO_GPA[row[3]] is not None]
+    plans = []
+    for r in range(len(candidates) + 1):
+        for subset in itertools.combinations(candidates, r):
+            su_cus = sum(rows[i][2] for i in subset)
+            if su_cus <= budget_cus:
+                plans.append((summarize(apply_su(rows, subset)).gpa, su_cus))
+    return [(gpa, su_cus) for gpa, su_cus in plans if not np.isnan(gpa)]
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_optimizer_matches_brute_force(seed):
+    rng = np.random.default_rng(seed)
+    rows = make_rows(int(rng.integers(1, 12)), rng)
+    eligible = (rng.random(len(rows)) > 0.2).tolist()
+    plans = brute_force(rows, 32.0, eligible)
+
+    plan = optimize_su(rows, 32.0, eligible)
+    assert plan.su_cus <= 32.0 and all(eligible[i] for i in plan.courses)
+    assert np.isclose(plan.summary.gpa, max([gpa for gpa, _ in plans], default = summarize(rows).gpa), equal_nan = True)
+
+    # With a target, the fewest S/Ued CUs reaching it
+    target = 4.0
+    reaching = [su_cus for gpa, su_cus in plans if round(gpa, 3) >= target]
+    plan = optimize_su(rows, 32.0, eligible, target = target)
+    if not reaching:
+        assert plan is None
+    else:
+        assert plan.su_cus == min(reaching) and round(plan.summary.gpa, 3) >= target
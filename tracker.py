@@ -0,0 +1,272 @@
+import math
+from array import array
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from gpa import EXPECTED_HEADERS, GRADE_POINTS, GRADES, IN_GPA, summary_from_totals
+from trajectory import GPATrajectory
+
+
+NUMERIC_COLUMNS = ["No. of CUs", "Grade Points"]
+
+# First bytes of a Parquet file (an .xlsx workbook is a zip archive starting with "PK")
+PARQUET_MAGIC = b"PAR1"
+
+
+class IngestResult(NamedTuple):
+    rows: pd.DataFrame
+    duplicates: int
+    unknown_codes: list
+    cu_mismatches: list
+
+
+def read_tracker_xlsx(source):
+    """Reads a Course Tracker workbook in openpyxl's streaming read-only mode and converts each column in bulk.
+    in:  path or file-like object of an .xlsx file in the expected_headers format
+    out: dataframe (raises ValueError if the headers are incorrect)
+    """
+    import zipfile
+
+    from openpyxl import load_workbook
+    from openpyxl.utils.exceptions import InvalidFileException
+
+    try:
+        workbook = load_workbook(source, read_only = True, data_only = True)
+    except (zipfile.BadZipFile, InvalidFileException, KeyError) as e:
+        raise ValueError(f"Could not read the .xlsx file ({e})")
+
+    width = len(EXPECTED_HEADERS)
+    try:
+        # Rows are padded to the full width, since read-only mode leaves trailing empty cells out
+        # of sheets written without a <dimension> element
+        rows = (row + (None,) * (width - len(row)) for row in workbook.worksheets[0].iter_rows(max_col = width, values_only = True))
+        headers = list(next(rows, ()))
+        while headers and headers[-1] is None:
+            headers.pop()
+        if headers != EXPECTED_HEADERS:
+            raise ValueError("Incorrect column headers. Please use the exact format: " + ", ".join(EXPECTED_HEADERS))
+
+        columns = list(zip(*(row for row in rows if any(v is not None for v in row)))) or [()] * width
+    finally:
+        workbook.close()
+
+    df = pd.DataFrame({header: pd.Series(values, dtype = object) for header, values in zip(EXPECTED_HEADERS, columns)})
+    for column in NUMERIC_COLUMNS:
+        df[column] = pd.to_numeric(df[column], errors = "coerce")
+
+    return df
+
+
+def read_tracker_parquet(source):
+    """Reads a Course Tracker written by export.to_parquet (or any Parquet file with the expected_headers columns).
+    "Grade" and "AY Taken" come back as Categoricals from their dictionary encoding.
+    in:  path or file-like object of a .parquet file
+    out: dataframe (raises ValueError if the headers are incorrect)
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    try:
+        parquet_file = pq.ParquetFile(source)
+    except pa.ArrowException as e:
+        raise ValueError(f"Could not read the .parquet file ({e})")
+    if parquet_file.schema_arrow.names != EXPECTED_HEADERS:
+        raise ValueError("Incorrect column headers. Please use the exact format: " + ", ".join(EXPECTED_HEADERS))
+
+    df = parquet_file.read().to_pandas()
+    for column in NUMERIC_COLUMNS:
+        if not pd.api.types.is_float_dtype(df[column]):
+            df[column] = pd.to_numeric(df[column], errors = "coerce")
+
+    return df
+
+
+def read_tracker(source):
+    """Reads a Course Tracker in either format, told apart by the file signature rather than the file name."""
+    if hasattr(source, "read"):
+        position = source.tell()
+        signature = source.read(len(PARQUET_MAGIC))
+        source.seek(position)
+    else:
+        with open(source, "rb") as f:
+            signature = f.read(len(PARQUET_MAGIC))
+
+    return read_tracker_parquet(source) if signature == PARQUET_MAGIC else read_tracker_xlsx(source)
+
+
+def normalized(df):
+    # Canonical column types so the same row hashes the same whether it was added by hand or uploaded
+    out = pd.DataFrame(index = df.index)
+    for column in EXPECTED_HEADERS:
+        if column in NUMERIC_COLUMNS:
+            out[column] = pd.to_numeric(df[column], errors = "coerce").astype(np.float64)
+        else:
+            out[column] = df[column].astype(object).where(df[column].notna(), "").astype(str)
+
+    return out
+
+
+def row_hashes(df):
+    """Content hash (uint64) of every tracker row."""
+    if df.empty:
+        return np.empty(0, dtype = np.uint64)
+
+    return pd.util.hash_pandas_object(normalized(df), index = False).to_numpy()
+
+
+def validate_against_catalog(df, catalog):
+    """Joins the uploaded course codes against the catalog in one pass.
+    out: (course codes not in the catalog, [(course code, uploaded CUs, catalog CUs)] for CU mismatches)
+    """
+    codes = df["Course Code"].astype(str).to_numpy()
+    positions = pd.Index(catalog.codes).get_indexer(codes)
+    found = positions >= 0
+
+    catalog_cus = np.full(len(codes), np.nan)
+    catalog_cus[found] = catalog.credits[positions[found]]
+    uploaded_cus = df["No. of CUs"].to_numpy(dtype = np.float64, na_value = np.nan)
+    mismatched = found & ~np.isclose(uploaded_cus, catalog_cus)
+
+    unknown_codes = list(dict.fromkeys(codes[~found]))
+    cu_mismatches = list(zip(codes[mismatched], uploaded_cus[mismatched].tolist(), catalog_cus[mismatched].tolist()))
+
+    return unknown_codes, cu_mismatches
+
+
+def ingest_upload(source, catalog, existing):
+    """Reads an uploaded tracker, validates it against the catalog and drops rows already in the tracker
+    (or repeated within the upload) by content hash.
+    """
+    df = read_tracker(source)
+    unknown_codes, cu_mismatches = validate_against_catalog(df, catalog)
+
+    hashes = row_hashes(df)
+    new = ~np.isin(hashes, row_hashes(existing)) & ~pd.Series(hashes).duplicated().to_numpy()
+
+    return IngestResult(rows = df[new].reset_index(drop = True),
+                        duplicates = int((~new).sum()),
+                        unknown_codes = unknown_codes,
+                        cu_mismatches = cu_mismatches)
+
+
+GRADE_CODES = {grade: code for code, grade in enumerate(GRADES)}
+
+
+class TrackerStore:
+    """Column-oriented Course Tracker state with running GPA aggregates.
+
+    Rows are kept in typed columns (CUs and grade points as float64 arrays, grades as int8 codes) and every
+    add, remove and clear updates the per-grade CU totals and course counts, so the current GPA and summary
+    are available in O(1) without building a DataFrame. The per-AY totals of the GPA trajectory are kept
+    up to date the same way.
+    """
+
+    def __init__(self, rows = ()):
+        self.clear()
+        self.extend(rows)
+
+    def clear(self):
+        self.codes = []
+        self.titles = []
+        self.cus = array("d")
+        self.grades = array("b")
+        self.grade_points = array("d")
+        self.ay_taken = []
+
+        self.cus_per_grade = np.zeros(len(GRADES))
+        self.count_per_grade = np.zeros(len(GRADES), dtype = np.int64)
+        self.total_cus = 0.0
+        self.trajectory = GPATrajectory()
+        self.version = 0
+        self._frame = None
+
+    def __len__(self):
+        return len(self.codes)
+
+    def _tally(self, code, cus, sign):
+        # CUs of missing or invalid values count as 0, like the summary engine
+        cus = 0.0 if math.isnan(cus) else cus
+        self.total_cus += sign * cus
+        if code >= 0:
+            self.cus_per_grade[code] += sign * cus
+            self.count_per_grade[code] += sign
+
+    def add(self, row):
+        """Appends a row in the expected_headers order."""
+        code, title, cus, grade, grade_points, ay_taken = row
+        cus = float("nan") if cus is None or pd.isna(cus) else float(cus)
+        grade_code = GRADE_CODES.get(grade, -1)
+
+        self.codes.append(code)
+        self.titles.append(title)
+        self.cus.append(cus)
+        self.grades.append(grade_code)
+        self.grade_points.append(float("nan") if grade_points is None or pd.isna(grade_points) else float(grade_points))
+        self.ay_taken.append(ay_taken)
+
+        self._tally(grade_code, cus, 1)
+        self.trajectory.update(ay_taken, grade_code, cus, 1)
+        self.version += 1
+
+    def extend(self, rows):
+        for row in rows:
+            self.add(row)
+
+    def pop(self):
+        """Removes and returns the last row."""
+        row = self.row(-1)
+        for column in (self.codes, self.titles, self.cus, self.grades, self.grade_points, self.ay_taken):
+            column.pop()
+
+        self._tally(GRADE_CODES.get(row[3], -1), row[2], -1)
+        self.trajectory.update(row[5], GRADE_CODES.get(row[3], -1), row[2], -1)
+        self.version += 1
+
+        return row
+
+    def row(self, i):
+        grade_code = self.grades[i]
+        grade_points = self.grade_points[i]
+        return [self.codes[i], self.titles[i], self.cus[i], GRADES[grade_code] if grade_code >= 0 else None,
+                None if math.isnan(grade_points) else grade_points, self.ay_taken[i]]
+
+    def rows(self):
+        return [self.row(i) for i in range(len(self))]
+
+    @property
+    def gpa(self):
+        gpa_cus = self.cus_per_grade[IN_GPA].sum()
+        return float(self.cus_per_grade[IN_GPA] @ GRADE_POINTS[IN_GPA]) / gpa_cus if gpa_cus else math.nan
+
+    @property
+    def gpa_cus(self):
+        return float(self.cus_per_grade[IN_GPA].sum())
+
+    def summary(self):
+        return summary_from_totals(self.cus_per_grade, self.count_per_grade, self.total_cus, len(self))
+
+    def to_frame(self, ay_categories = None):
+        """Builds the tracker DataFrame with Categorical "Grade" and "AY Taken" columns.
+        The frame is cached until the next edit.
+        """
+        key = (self.version, None if ay_categories is None else tuple(ay_categories))
+        if self._frame is not None and self._frame[0] == key:
+            return self._frame[1]
+
+        grade_codes = np.frombuffer(self.grades, dtype = np.int8) if len(self) else np.empty(0, dtype = np.int8)
+        ay_taken = pd.Categorical(self.ay_taken, categories = ay_categories) if ay_categories is not None else pd.Categorical(self.ay_taken)
+
+        df = pd.DataFrame({
+            "Course Code": pd.Series(self.codes, dtype = object),
+            "Course Title": pd.Series(self.titles, dtype = object),
+            "No. of CUs": np.array(self.cus, dtype = np.float64),
+            "Grade": pd.Categorical.from_codes(grade_codes, categories = GRADES),
+            "Grade Points": np.array(self.grade_points, dtype = np.float64),
+            "AY Taken": ay_taken
+        }, columns = EXPECTED_HEADERS)
+
+        self._frame = (key, df)
+
+        return df
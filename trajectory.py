@@ -0,0 +1,158 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+from gpa import DEGREE_CLASSES, EXPECTED_HEADERS, GRADE_POINTS, IN_GPA, NOT_COMPLETED, grade_codes
+
+
+TRAJECTORY_COLUMNS = ["Term", "Courses", "Term GPA", "Term GPA CUs", "Cumulative GPA", "Cumulative GPA CUs", "Cumulative CUs Completed", "Degree Classification"]
+
+# Per-term totals: CU-weighted grade points, CUs counted in GPA, CUs completed and number of courses
+_POINTS, _GPA_CUS, _COMPLETED, _COURSES = range(4)
+
+
+def term_key(term):
+    # "2023/2024", "AY 2023-2024" and "2023/2024 Sem 2" sort by their numbers, anything else after them by name
+    numbers = tuple(int(n) for n in re.findall(r"\d+", str(term)))
+    return (0, numbers, str(term)) if numbers else (1, (), str(term))
+
+
+def degree_classes(gpa):
+    """Vectorized degree_classification over an array of GPAs."""
+    rounded = np.round(np.asarray(gpa, dtype = np.float64), 3)
+    with np.errstate(invalid = "ignore"):
+        conditions = [rounded >= threshold for threshold in DEGREE_CLASSES.values()]
+    return np.select(conditions, list(DEGREE_CLASSES), default = "Below Graduation Threshold")
+
+
+def _row_totals(codes, cus):
+    # Per-row contributions to the term totals, following the summary engine's rules
+    codes = np.asarray(codes, dtype = np.int64)
+    cus = np.nan_to_num(np.asarray(cus, dtype = np.float64))
+    known = codes >= 0
+    in_gpa = known & IN_GPA[np.where(known, codes, 0)]
+    not_completed = known & NOT_COMPLETED[np.where(known, codes, 0)]
+
+    totals = np.zeros((len(codes), 4))
+    totals[:, _POINTS] = np.where(in_gpa, cus * np.nan_to_num(GRADE_POINTS[np.where(known, codes, 0)]), 0.0)
+    totals[:, _GPA_CUS] = np.where(in_gpa, cus, 0.0)
+    totals[:, _COMPLETED] = np.where(not_completed, 0.0, cus)
+    totals[:, _COURSES] = 1
+
+    return totals
+
+
+def _frame(labels, term_totals, first_of_student):
+    """Cumulative series from per-term totals (one row per student and term, in order), restarting
+    the running sums wherever first_of_student is set."""
+    cumulative = np.cumsum(term_totals, axis = 0)
+    # Subtract the running sums carried over from previous students
+    starts = np.flatnonzero(first_of_student)
+    carried = np.zeros_like(term_totals)
+    carried[starts] = cumulative[starts] - term_totals[starts]
+    latest_start = np.maximum.accumulate(np.where(first_of_student, np.arange(len(labels)), 0)) if len(labels) else np.zeros(0, dtype = np.int64)
+    cumulative -= carried[latest_start]
+
+    with np.errstate(divide = "ignore", invalid = "ignore"):
+        # Tolerance for what running additions and removals leave behind
+        term_gpa = np.where(term_totals[:, _GPA_CUS] > 1e-9, term_totals[:, _POINTS] / term_totals[:, _GPA_CUS], np.nan)
+        cumulative_gpa = np.where(cumulative[:, _GPA_CUS] > 1e-9, cumulative[:, _POINTS] / cumulative[:, _GPA_CUS], np.nan)
+
+    return pd.DataFrame({
+        "Term": labels,
+        "Courses": term_totals[:, _COURSES].astype(np.int64),
+        "Term GPA": term_gpa,
+        "Term GPA CUs": term_totals[:, _GPA_CUS],
+        "Cumulative GPA": cumulative_gpa,
+        "Cumulative GPA CUs": cumulative[:, _GPA_CUS],
+        "Cumulative CUs Completed": cumulative[:, _COMPLETED],
+        "Degree Classification": degree_classes(cumulative_gpa)
+    }, columns = TRAJECTORY_COLUMNS)
+
+
+def gpa_trajectory(records, student_column = None, term_column = "AY Taken", semester_column = None):
+    """Term-by-term and cumulative GPA, CUs and degree classification of one tracker or a cohort of stacked trackers.
+
+    Rows are grouped by (student, term) in term order and each group's totals are summed once, then the cumulative
+    figures are running sums over the groups, so the aggregate is never recomputed for each prefix.
+    Rows without a term are left out.
+    in:  DataFrame (or rows) with the expected_headers columns, plus student_column and semester_column if given
+    out: DataFrame with TRAJECTORY_COLUMNS (after student_column for a cohort), one row per student and term
+    """
+    df = records if isinstance(records, pd.DataFrame) else pd.DataFrame(list(records), columns = EXPECTED_HEADERS)
+
+    terms = df[term_column].astype(object).where(df[term_column].notna(), None)
+    if semester_column is not None:
+        semesters = df[semester_column].astype(object)
+        terms = pd.Series([None if t is None else (t if pd.isna(s) else f"{t} Sem {s}") for t, s in zip(terms, semesters)], index = df.index, dtype = object)
+
+    ordered_terms = sorted(set(t for t in terms if t is not None), key = term_key)
+    term_codes = pd.Categorical(terms, categories = ordered_terms).codes.astype(np.int64)
+
+    if student_column is not None:
+        student_codes, students = pd.factorize(df[student_column], sort = True)
+    else:
+        student_codes, students = np.zeros(len(df), dtype = np.int64), None
+
+    totals = _row_totals(grade_codes(df["Grade"]), df["No. of CUs"].to_numpy(dtype = np.float64, na_value = np.nan))
+
+    keep = (term_codes >= 0) & (student_codes >= 0)
+    order = np.flatnonzero(keep)[np.lexsort((term_codes[keep], student_codes[keep]))]
+    student_sorted, term_sorted = student_codes[order], term_codes[order]
+
+    new_group = np.ones(len(order), dtype = bool)
+    new_group[1:] = (student_sorted[1:] != student_sorted[:-1]) | (term_sorted[1:] != term_sorted[:-1])
+    group_starts = np.flatnonzero(new_group)
+
+    term_totals = np.add.reduceat(totals[order], group_starts, axis = 0) if len(order) else np.zeros((0, 4))
+    group_students = student_sorted[group_starts]
+    first_of_student = np.ones(len(group_starts), dtype = bool)
+    first_of_student[1:] = group_students[1:] != group_students[:-1]
+
+    out = _frame(np.array(ordered_terms, dtype = object)[term_sorted[group_starts]], term_totals, first_of_student)
+    if student_column is not None:
+        out.insert(0, student_column, np.asarray(students, dtype = object)[group_students])
+
+    return out
+
+
+class GPATrajectory:
+    """Running per-term totals of one tracker, updated in O(1) as rows are added or removed.
+    The cumulative series only has to run over the (few) terms when it is read.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self._terms = {}
+        self.version = 0
+        self._series = None
+
+    def update(self, term, grade_code, cus, sign = 1):
+        if term is None or (isinstance(term, float) and np.isnan(term)):
+            return
+        totals = self._terms.setdefault(term, np.zeros(4))
+        totals += sign * _row_totals([grade_code], [cus])[0]
+        if totals[_COURSES] <= 0:
+            del self._terms[term]
+        self.version += 1
+
+    def __len__(self):
+        return len(self._terms)
+
+    def frame(self):
+        """Same columns as gpa_trajectory, cached until the next update."""
+        if self._series is not None and self._series[0] == self.version:
+            return self._series[1]
+
+        labels = sorted(self._terms, key = term_key)
+        term_totals = np.array([self._terms[t] for t in labels]).reshape(len(labels), 4)
+        first_of_student = np.zeros(len(labels), dtype = bool)
+        first_of_student[:1] = True
+
+        series = _frame(np.array(labels, dtype = object), term_totals, first_of_student)
+        self._series = (self.version, series)
+
+        return series